@@ -0,0 +1,354 @@
+"""
+HTTP JSON API: the BhashaAI pipeline for partner apps, without the Streamlit UI.
+
+Usage: python api.py [--port 8000] [--address 0.0.0.0]
+
+    POST /extract  multipart "file" (or the raw bytes with ?filename=) -> {"text", "chars", "seconds"}
+                   ?stream=1 streams NDJSON progress lines, then the result line
+    POST /explain  {"text", "language"}, or multipart "file" + "language" -> {"explanation", "skipped_chars"}
+                   ?stream=1 streams the explanation as plain text (X-Skipped-Chars header) while it is generated
+    POST /tts      {"text", "language"} -> streamed audio/mpeg (audio/wav from espeak); the
+                   X-Speech-Language header names the voice, Hindi when none exists for the language
+    POST /pdf      {"text", "language"} -> application/pdf
+    GET  /health   warm-up state and per-stage load
+    GET  /metrics  Prometheus metrics (stage latency histograms, cache hit rates, in-flight counts)
+
+Each stage has its own worker pool (API_*_CONCURRENCY); once API_QUEUE_LIMIT
+requests are waiting for a stage, new ones get 503 instead of piling up.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from bhashaai import (ExtractionError, GroqError, TTSError, UnsupportedLanguageError, check_language, explain_stream,
+                      explain_text, extract_document, render_pdf, speech_language, synthesize_speech_stream,
+                      unexplained_chars)
+from utils.fonts import has_font
+from utils.groq_api import POOL_SIZE
+from utils.metrics import metrics_text, registry
+from utils.tts import audio_mime
+from utils.warmup import get_readiness, start_warmup
+
+API_OCR_CONCURRENCY = int(os.getenv("API_OCR_CONCURRENCY", 2))
+# Explanations mostly wait on Groq; more than the client's connection pool would only queue there
+API_LLM_CONCURRENCY = int(os.getenv("API_LLM_CONCURRENCY", POOL_SIZE))
+API_TTS_CONCURRENCY = int(os.getenv("API_TTS_CONCURRENCY", 4))
+API_PDF_CONCURRENCY = int(os.getenv("API_PDF_CONCURRENCY", 2))
+API_QUEUE_LIMIT = int(os.getenv("API_QUEUE_LIMIT", 32))
+API_MAX_UPLOAD_MB = float(os.getenv("API_MAX_UPLOAD_MB", 25))
+
+
+class Overloaded(Exception):
+    """Raised when a stage's queue is full"""
+
+
+class StreamClosed(Exception):
+    """Raised inside a worker when the client has gone away"""
+
+
+class StagePool:
+    """Bounded worker threads for one pipeline stage, shedding load once its queue is full
+
+    pending is only touched on the event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, name, workers, queue_limit=API_QUEUE_LIMIT):
+        self.name = name
+        self.workers = workers
+        self.limit = workers + queue_limit
+        self.pending = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"api-{name}")
+
+    def _admit(self):
+        if self.pending >= self.limit:
+            raise Overloaded(f"Too many {self.name} requests in progress, retry shortly")
+        self.pending += 1
+
+    def _release(self):
+        self.pending -= 1
+
+    async def run(self, function, *args):
+        self._admit()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        finally:
+            self._release()
+
+    async def stream(self, work):
+        """Run work(emit) on a worker and yield everything it emits, as it is emitted
+
+        Closing the generator (e.g. on client disconnect) makes the next emit
+        raise StreamClosed, which stops the worker early.
+        """
+        self._admit()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        closed = threading.Event()
+        done = object()
+
+        def emit(item):
+            if closed.is_set():
+                raise StreamClosed()
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        def produce():
+            try:
+                work(emit)
+                result = done
+            except StreamClosed:
+                return
+            except Exception as e:
+                result = e
+            finally:
+                loop.call_soon_threadsafe(self._release)
+            loop.call_soon_threadsafe(queue.put_nowait, result)
+
+        loop.run_in_executor(self.executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            closed.set()
+
+    def stats(self):
+        return {"workers": self.workers, "pending": self.pending, "limit": self.limit}
+
+
+POOLS = {
+    "extract": StagePool("extract", API_OCR_CONCURRENCY),
+    "explain": StagePool("explain", API_LLM_CONCURRENCY),
+    "tts": StagePool("tts", API_TTS_CONCURRENCY),
+    "pdf": StagePool("pdf", API_PDF_CONCURRENCY),
+}
+
+
+def pool_samples():
+    for name, pool in POOLS.items():
+        yield "bhashaai_api_requests_pending", "gauge", {"pool": name}, pool.pending
+        yield "bhashaai_api_requests_limit", "gauge", {"pool": name}, pool.limit
+
+
+registry.register_collector(pool_samples)
+
+
+def emit_all(iterator_factory):
+    """Adapt a blocking generator to StagePool.stream"""
+    def work(emit):
+        for item in iterator_factory():
+            emit(item)
+    return work
+
+
+async def streaming(pool, work, media_type, encode=lambda item: item, headers=None):
+    """StreamingResponse whose status reflects failures before the first item"""
+    items = pool.stream(work)
+    # Errors raised before any output (bad key, unsupported language) still get a proper status
+    first = await anext(items, None)
+    if first is None:
+        return Response(b"", status_code=204)
+
+    async def body():
+        try:
+            yield encode(first)
+            async for item in items:
+                yield encode(item)
+        finally:
+            await items.aclose()
+
+    # media_type may be a function of the first item, e.g. audio sniffed from its header
+    return StreamingResponse(body(), media_type=media_type(first) if callable(media_type) else media_type,
+                             headers=headers)
+
+
+async def read_request(request):
+    """Request fields and the uploaded file (bytes, filename, content type) if any
+
+    Fields come from a JSON body, a multipart/urlencoded form, or the query string.
+    """
+    length = request.headers.get("content-length")
+    if length and int(length) > API_MAX_UPLOAD_MB * 1024 * 1024:
+        raise HTTPException(413, f"Upload larger than {API_MAX_UPLOAD_MB:g} MB")
+
+    fields = dict(request.query_params)
+    upload = None
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        body = json.loads(await request.body() or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("JSON body must be an object")
+        fields.update(body)
+    elif content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+        async with request.form() as form:
+            for name, value in form.multi_items():
+                if isinstance(value, str):
+                    fields[name] = value
+                elif name == "file":
+                    upload = (await value.read(), value.filename, value.content_type)
+    else:
+        data = await request.body()
+        if data:
+            upload = (data, fields.get("filename"), content_type or None)
+    return fields, upload
+
+
+def wants_stream(fields):
+    return str(fields.get("stream", "")).lower() in ("1", "true", "yes")
+
+
+def text_and_language(fields):
+    text, language = fields.get("text"), fields.get("language", "Hindi")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("'text' is required")
+    check_language(language)
+    return text, language
+
+
+def extract_upload(data, filename, mime, progress=None):
+    """extract_document, with unreadable uploads reported as ExtractionError"""
+    try:
+        text = extract_document(data, filename, mime, progress=progress)
+    except (ExtractionError, StreamClosed):
+        raise
+    except Exception as e:
+        raise ExtractionError(f"Could not read {filename or 'the upload'}: {e}") from e
+    if not text:
+        raise ExtractionError("No text could be extracted")
+    return text
+
+
+async def extract(request):
+    fields, upload = await read_request(request)
+    if upload is None:
+        raise ValueError("Upload a PDF or image as 'file'")
+    data, filename, mime = upload
+
+    def work(emit):
+        started = time.perf_counter()
+        text = extract_upload(data, filename, mime, progress=lambda done, total: emit({"progress": done, "total": total}))
+        emit({"text": text, "chars": len(text), "seconds": round(time.perf_counter() - started, 3)})
+
+    if wants_stream(fields):
+        return await streaming(POOLS["extract"], work, "application/x-ndjson",
+                               lambda item: json.dumps(item, ensure_ascii=False) + "\n")
+    result = None
+    async for item in POOLS["extract"].stream(work):
+        result = item
+    return JSONResponse(result)
+
+
+async def explain(request):
+    fields, upload = await read_request(request)
+    if upload is not None:
+        # A bad language is rejected before it costs an OCR run
+        check_language(fields.get("language", "Hindi"))
+        data, filename, mime = upload
+        fields["text"] = await POOLS["extract"].run(extract_upload, data, filename, mime)
+    text, language = text_and_language(fields)
+    # Text past the explanation token budget is left out; clients are told how much.
+    # Planning the chunks is CPU work, so it stays off the event loop
+    skipped = await POOLS["explain"].run(unexplained_chars, text)
+
+    if wants_stream(fields):
+        return await streaming(POOLS["explain"], emit_all(lambda: explain_stream(text, language)),
+                               "text/plain; charset=utf-8", lambda token: token.encode("utf-8"),
+                               headers={"X-Skipped-Chars": str(skipped)})
+    explanation = await POOLS["explain"].run(explain_text, text, language)
+    if not explanation:
+        raise GroqError("Empty explanation")
+    return JSONResponse({"explanation": explanation, "language": language, "skipped_chars": skipped})
+
+
+async def tts(request):
+    fields, _ = await read_request(request)
+    text, language = text_and_language(fields)
+    # Languages no backend can voice are spoken in the fallback language; clients are told which
+    return await streaming(POOLS["tts"], emit_all(lambda: synthesize_speech_stream(text, language)), audio_mime,
+                           headers={"X-Speech-Language": speech_language(language)})
+
+
+async def pdf(request):
+    fields, _ = await read_request(request)
+    text, language = text_and_language(fields)
+    if not has_font(language):
+        # Without a script font the renderer could only fall back to unreadable output
+        return JSONResponse({"error": f"PDF output is not available for {language}"}, status_code=422)
+    pdf_bytes = await POOLS["pdf"].run(render_pdf, text, language)
+    if pdf_bytes is None:
+        return JSONResponse({"error": "PDF generation failed"}, status_code=500)
+    return Response(pdf_bytes, media_type="application/pdf")
+
+
+async def metrics(request):
+    return PlainTextResponse(metrics_text(), media_type="text/plain; version=0.0.4")
+
+
+async def health(request):
+    return JSONResponse({"readiness": get_readiness(), "pools": {name: pool.stats() for name, pool in POOLS.items()}})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    start_warmup()
+    yield
+
+
+def error_handler(status_code):
+    async def handle(request, exc):
+        headers = {"Retry-After": "5"} if status_code == 503 else None
+        return JSONResponse({"error": str(exc)}, status_code=status_code, headers=headers)
+    return handle
+
+
+app = Starlette(
+    routes=[
+        Route("/extract", extract, methods=["POST"]),
+        Route("/explain", explain, methods=["POST"]),
+        Route("/tts", tts, methods=["POST"]),
+        Route("/pdf", pdf, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ],
+    exception_handlers={
+        ValueError: error_handler(400),
+        ExtractionError: error_handler(422),
+        GroqError: error_handler(502),
+        TTSError: error_handler(502),  # Upstream failure
+        UnsupportedLanguageError: error_handler(422),
+        Overloaded: error_handler(503),
+    },
+    lifespan=lifespan,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="BhashaAI HTTP API")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--address", default="127.0.0.1")
+    args = parser.parse_args()
+    # One process: every request shares the warm OCR reader and the pooled Groq client
+    uvicorn.run(app, host=args.address, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
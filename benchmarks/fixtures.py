@@ -0,0 +1,182 @@
+"""Synthetic benchmark inputs, generated once and reused from disk
+
+Run from the repository root:  python -m benchmarks.fixtures [--quick] [--dir benchmarks/.fixtures]
+"""
+import argparse
+import os
+import random
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from utils.fonts import DEVANAGARI_FONT, find_font_file
+
+FIXTURES_DIR = os.getenv("BENCH_FIXTURES_DIR", os.path.join("benchmarks", ".fixtures"))
+PAGE_COUNTS = (1, 10, 100)
+SCAN_DPIS = (150, 200, 300)
+HINDI_OUTPUT_CHARS = (2000, 20000, 100000)
+
+A4_INCHES = (8.27, 11.69)
+
+ENGLISH_LINES = [
+    "GOVERNMENT OF MAHARASHTRA - REVENUE AND FORESTS DEPARTMENT",
+    "Notice under Section 149 of the Maharashtra Land Revenue Code, 1966.",
+    "The applicant must submit Form 16 together with the 7/12 extract before 31 March.",
+    "Failure to appear on the date of hearing shall result in an ex parte decision.",
+    "Tax deducted at source will be refunded after verification of Aadhaar and PAN.",
+    "Beneficiaries under PM-KISAN receive Rs. 6000 per year in three instalments.",
+    "Any objection may be filed in writing at the Tahsil office within fifteen days.",
+    "This is a computer generated document and does not require a signature.",
+]
+
+HINDI_SENTENCES = [
+    "इस सूचना के अनुसार आवेदक को अंतिम तिथि से पहले फॉर्म 16 जमा करना होगा।",
+    "यदि आप सुनवाई की तारीख पर उपस्थित नहीं होते हैं, तो निर्णय आपकी अनुपस्थिति में लिया जाएगा।",
+    "प्रधानमंत्री किसान सम्मान निधि योजना के तहत पात्र किसानों को हर साल छह हजार रुपये तीन किस्तों में मिलते हैं।",
+    "आधार और पैन की जांच के बाद काटा गया कर वापस कर दिया जाएगा।",
+    "किसी भी आपत्ति को पंद्रह दिनों के भीतर तहसील कार्यालय में लिखित रूप में दिया जा सकता है।",
+    "**महत्वपूर्ण:** यह दस्तावेज़ कंप्यूटर द्वारा बनाया गया है और इस पर हस्ताक्षर की आवश्यकता नहीं है।",
+]
+
+
+def _font(size):
+    font_path = find_font_file(DEVANAGARI_FONT[1])
+    return ImageFont.truetype(font_path, size) if font_path else ImageFont.load_default(size)
+
+
+def long_hindi_output(chars, seed=0):
+    """Explanation-like Hindi text of about chars characters, in paragraphs"""
+    rng = random.Random(seed)
+    paragraphs, length = [], 0
+    while length < chars:
+        paragraph = " ".join(rng.choice(HINDI_SENTENCES) for _ in range(rng.randint(3, 6)))
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:chars]
+
+
+def page_image(dpi, page_number, seed=0):
+    """A scanned-looking A4 page: dense English text, slightly rotated, blurred and speckled"""
+    rng = random.Random(seed * 1000 + page_number)
+    width, height = int(A4_INCHES[0] * dpi), int(A4_INCHES[1] * dpi)
+    image = Image.new("L", (width, height), 245)
+    draw = ImageDraw.Draw(image)
+    font = _font(max(10, dpi // 7))  # ~10pt body text
+    margin, line_height = dpi, int(dpi / 7 * 1.5)
+    y = margin
+    draw.text((margin, y), f"Page {page_number}", fill=20, font=font)
+    y += 2 * line_height
+    while y < height - margin:
+        draw.text((margin, y), rng.choice(ENGLISH_LINES), fill=rng.randint(10, 60), font=font)
+        y += line_height
+    for _ in range(width * height // 4000):  # Scanner dust
+        draw.point((rng.randrange(width), rng.randrange(height)), fill=rng.randint(0, 120))
+    image = image.rotate(rng.uniform(-1.5, 1.5), resample=Image.BICUBIC, fillcolor=245)
+    return image.filter(ImageFilter.GaussianBlur(0.6))
+
+
+def text_pdf(pages):
+    """A born-digital PDF with a text layer on every page"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    rng = random.Random(pages)
+    for page_number in range(1, pages + 1):
+        y = A4[1] - 72
+        pdf.setFont("Helvetica", 10)
+        pdf.drawString(72, y, f"Page {page_number}")
+        while y > 90:
+            y -= 14
+            pdf.drawString(72, y, rng.choice(ENGLISH_LINES))
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def scanned_pdf(pages, dpi):
+    """An image-only PDF: one JPEG page scan per page, no text layer"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for page_number in range(1, pages + 1):
+        scan = BytesIO()
+        page_image(dpi, page_number).save(scan, "JPEG", quality=75)
+        scan.seek(0)
+        pdf.drawImage(ImageReader(scan), 0, 0, width=A4[0], height=A4[1])
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def phone_photo(megapixels, exif_rotated=False):
+    """A handheld photo of a printed page: perspective, uneven light, camera JPEG
+
+    With exif_rotated the pixels are stored sideways with EXIF orientation 6,
+    as phones do, so the EXIF fix in preprocessing is exercised.
+    """
+    height = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    width = int(height * 3 / 4)
+    page = page_image(300, 1, seed=megapixels).convert("RGB").resize((int(width * 0.8), int(height * 0.8)))
+    photo = Image.new("RGB", (width, height), (92, 74, 60))  # Table top
+    photo.paste(page, (width // 10, height // 10))
+    # Keystone: the top edge is further from the camera than the bottom
+    inset = width // 25
+    photo = photo.transform((width, height), Image.QUAD, (inset, 0, 0, height, width, height, width - inset, 0),
+                            resample=Image.BILINEAR)
+    shade = Image.linear_gradient("L").resize((width, height)).point(lambda value: 255 - value // 3)
+    photo = Image.composite(photo, Image.new("RGB", (width, height), (0, 0, 0)), shade)
+    output = BytesIO()
+    if exif_rotated:
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        photo.transpose(Image.ROTATE_90).save(output, "JPEG", quality=85, exif=exif)
+    else:
+        photo.save(output, "JPEG", quality=85)
+    return output.getvalue()
+
+
+def fixture_specs(quick=False):
+    """(file name, generator) for every fixture; quick drops the 100-page and 300 DPI ones"""
+    page_counts = [pages for pages in PAGE_COUNTS if not (quick and pages >= 100)]
+    dpis = [dpi for dpi in SCAN_DPIS if not (quick and dpi >= 300)]
+    specs = [(f"text_{pages}p.pdf", lambda pages=pages: text_pdf(pages)) for pages in page_counts]
+    specs += [(f"scan_{pages}p_{dpi}dpi.pdf", lambda pages=pages, dpi=dpi: scanned_pdf(pages, dpi))
+              for pages in page_counts for dpi in dpis]
+    specs += [("photo_2mp.jpg", lambda: phone_photo(2)), ("photo_12mp_exif.jpg", lambda: phone_photo(12, True))]
+    specs += [(f"hindi_{chars}.txt", lambda chars=chars: long_hindi_output(chars).encode("utf-8"))
+              for chars in HINDI_OUTPUT_CHARS]
+    return specs
+
+
+def ensure_fixtures(directory=FIXTURES_DIR, quick=False, log=print):
+    """Generate missing fixtures into directory; returns {file name: path}"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, generate in fixture_specs(quick):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            log(f"Generating {name}")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(generate())
+            os.replace(tmp_path, path)
+        paths[name] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=FIXTURES_DIR)
+    parser.add_argument("--quick", action="store_true", help="skip 100-page and 300 DPI fixtures")
+    args = parser.parse_args()
+    for name, path in ensure_fixtures(args.dir, args.quick).items():
+        print(f"{os.path.getsize(path) / 1024:10.0f} KB  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Local OpenAI-compatible stand-in for Groq that replays recorded completions
+
+Run from the repository root:
+    python -m benchmarks.mock_groq [--port 8081] [--latency 0.8] [--token-latency 0.01]
+then start the app or a benchmark with GROQ_API_URL=http://127.0.0.1:8081/v1/chat/completions.
+
+With --record, requests are forwarded to the real API (GROQ_API_KEY) and the
+completions appended to the recordings file for later replay.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+RECORDINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings", "groq.jsonl")
+UPSTREAM_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+
+def load_recordings(path=RECORDINGS_FILE):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def stream_tokens(content):
+    """Split a completion into word-sized deltas, as the streaming API sends them"""
+    words = content.split(" ")
+    return [word + (" " if index < len(words) - 1 else "") for index, word in enumerate(words)]
+
+
+class MockGroq:
+    """Replays recordings with first_token_latency before the first byte and token_latency per delta
+
+    The recording served is picked by a hash of the request messages, so runs are repeatable.
+    """
+
+    def __init__(self, recordings=None, first_token_latency=0.0, token_latency=0.0, record_path=None):
+        self.recordings = recordings if recordings is not None else load_recordings()
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.record_path = record_path
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def pick(self, body):
+        digest = hashlib.sha256(json.dumps(body.get("messages"), sort_keys=True).encode("utf-8")).digest()
+        return self.recordings[int.from_bytes(digest[:4], "big") % len(self.recordings)]
+
+    def record(self, body):
+        """Ask the real API (non-streaming) and keep its completion"""
+        response = requests.post(UPSTREAM_URL, json=dict(body, stream=False), timeout=120, headers={
+            "Authorization": f"Bearer {os.environ['GROQ_API_KEY']}"
+        })
+        response.raise_for_status()
+        data = response.json()
+        recording = {"content": data["choices"][0]["message"]["content"], "usage": data.get("usage")}
+        with self._lock:
+            self.recordings.append(recording)
+            with open(self.record_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(recording, ensure_ascii=False) + "\n")
+        return recording
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with mock._lock:
+                    mock.requests += 1
+                recording = mock.record(body) if mock.record_path else mock.pick(body)
+                time.sleep(mock.first_token_latency)
+                if body.get("stream"):
+                    self.send_stream(recording)
+                else:
+                    self.send_json(recording)
+
+            def send_json(self, recording):
+                data = json.dumps({
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": recording["content"]},
+                                 "finish_reason": "stop"}],
+                    "usage": recording.get("usage")
+                }, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def send_stream(self, recording):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for index, token in enumerate(stream_tokens(recording["content"])):
+                    if index and mock.token_latency:
+                        time.sleep(mock.token_latency)
+                    self.send_chunk({"object": "chat.completion.chunk",
+                                     "choices": [{"index": 0, "delta": {"content": token}}]})
+                self.send_chunk({"object": "chat.completion.chunk",
+                                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                                 "x_groq": {"usage": recording.get("usage")}})
+                self.send_chunk("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def send_chunk(self, event):
+                payload = event if isinstance(event, str) else json.dumps(event, ensure_ascii=False)
+                data = f"data: {payload}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self, host="127.0.0.1", port=0):
+        """Serve in a background thread; returns the chat completions URL"""
+        self._server = ThreadingHTTPServer((host, port), self.handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-groq", daemon=True).start()
+        return f"http://{host}:{self._server.server_port}/v1/chat/completions"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds before the first byte")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="seconds between streamed tokens")
+    parser.add_argument("--recordings", default=RECORDINGS_FILE)
+    parser.add_argument("--record", action="store_true", help="forward to the real API and append its completions")
+    args = parser.parse_args()
+
+    mock = MockGroq(load_recordings(args.recordings) if os.path.exists(args.recordings) else [],
+                    args.latency, args.token_latency, record_path=args.recordings if args.record else None)
+    url = mock.start(args.host, args.port)
+    print(f"Mock Groq at {url} ({len(mock.recordings)} recordings)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
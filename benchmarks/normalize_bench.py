@@ -0,0 +1,100 @@
+"""Micro-benchmark: utils.normalize against the cleanup loops it replaced
+
+Run from the repository root:  python -m benchmarks.normalize_bench [--kb 100]
+"""
+import argparse
+import json
+import timeit
+
+from utils.normalize import normalize
+
+SAMPLE = (
+    "प्रधानमंत्री किसान सम्मान निधि योजना के तहत पात्र किसानों को ₹6000 प्रति वर्ष तीन किस्तों में मिलते हैं।\u200d "
+    "Applicants must submit Form 16 â€œbefore the deadlineâ€ and keep a copy.\ufeff\n\n"
+    "**महत्वपूर्ण:** आवेदन   ऑनलाइन भी किया जा सकता है।\r\n"
+)
+
+
+# The implementations below are the pre-normalize versions from pages/app.py, kept for comparison
+
+def legacy_preprocess_text(text):
+    text = text.replace('\u200d', '').replace('\u200c', '')
+    text = text.replace('\ufeff', '')
+    text = text.replace('â€™', "'").replace('â€œ', '"').replace('â€', '"')
+    text = ' '.join(text.split())
+    return text
+
+
+def legacy_preprocess_text_for_pdf_safe(text):
+    safe_chars = []
+    for char in text:
+        try:
+            char_code = ord(char)
+            if (
+                (0x0020 <= char_code <= 0x007E) or
+                (0x00A0 <= char_code <= 0x00FF) or
+                (0x0900 <= char_code <= 0x097F) or
+                char in ' \n\r\t।'
+            ):
+                safe_chars.append(char)
+            else:
+                safe_chars.append(' ')
+        except:
+            safe_chars.append(' ')
+    text = ''.join(safe_chars)
+    replacements = {
+        'â€™': "'", 'â€œ': '"', 'â€': '"', 'â€˜': "'",
+        'Ã¡': 'á', 'Ã©': 'é', 'Ã­': 'í', 'Ã³': 'ó', 'Ãº': 'ú'
+    }
+    for old, new in replacements.items():
+        text = text.replace(old, new)
+    text = ' '.join(text.split())
+    return text.strip()
+
+
+def legacy_ascii(text):
+    ascii_text = ""
+    for char in text:
+        if ord(char) < 128:
+            ascii_text += char
+        elif char in 'नमस्तेकमैंहूसरकारभारतीयहिंदीमराठीबंगालीतमिलतेलुगुगुजरातीमलयालमकन्नडओडिया':
+            ascii_text += "?"
+        else:
+            ascii_text += " "
+    return ' '.join(ascii_text.split())
+
+
+CASES = [
+    ("display", legacy_preprocess_text, "display"),
+    ("pdf_safe", legacy_preprocess_text_for_pdf_safe, "pdf_safe"),
+    ("ascii", legacy_ascii, "ascii")
+]
+
+
+def best_of(func, text, number, repeat=5):
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kb", type=int, default=100, help="input size in KB of UTF-8 text")
+    parser.add_argument("--number", type=int, default=5, help="calls per timing")
+    args = parser.parse_args()
+
+    text = SAMPLE * (args.kb * 1024 // len(SAMPLE.encode("utf-8")) + 1)
+    results = {"input_chars": len(text)}
+    for name, legacy, profile in CASES:
+        before = best_of(legacy, text, args.number)
+        after = best_of(lambda t: normalize(t, profile), text, args.number)
+        results[name] = {
+            "legacy_ms": round(before * 1000, 3),
+            "normalize_ms": round(after * 1000, 3),
+            "speedup": round(before / after, 1)
+        }
+    for profile in ("llm", "pdf", "tts"):
+        results[profile] = {"normalize_ms": round(best_of(lambda t: normalize(t, profile), text, args.number) * 1000, 3)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Offline per-stage pipeline benchmark on synthetic fixtures, written as JSON
+
+Run from the repository root:
+    python -m benchmarks.pipeline_bench [--quick] [--stages pdf_classify,tts] [--compare benchmarks/results/abc1234.json]
+
+Groq is replaced by benchmarks.mock_groq and Google TTS by a local stub, so
+nothing leaves the machine and network latency is whatever --groq-latency and
+--tts-latency say. Results go to benchmarks/results/<commit>.json by default.
+"""
+import argparse
+import base64
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+
+# Keep benchmark runs out of the app's caches and span log; must be set before utils is imported
+os.environ.setdefault("BHASHAAI_CACHE_DIR", tempfile.mkdtemp(prefix="bhashaai-bench-"))
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("BHASHAAI_METRICS_LOG", "")
+
+import numpy as np
+from PIL import Image
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from benchmarks.fixtures import FIXTURES_DIR, ensure_fixtures
+from benchmarks.mock_groq import MockGroq
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+REGRESSION_RATIO = 1.10
+SLOW_RUN_SECONDS = 10  # A case this slow is run once, whatever --repeat says
+
+
+class StubTTSAdapter(BaseAdapter):
+    """Answers gTTS batchexecute requests locally after a fixed delay, with fake MP3 bytes"""
+
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        time.sleep(self.latency)
+        # About 1 KB of audio per 100 characters, like real gTTS output
+        audio = base64.b64encode(b"\xff\xf3\x44\xc4" * (len(request.body or b"") * 3)).decode("ascii")
+        response = Response()
+        response.status_code = 200
+        response.raw = BytesIO(f')]}}\'\n\n[["wrb.fr","jQ1olc","[\\"{audio}\\"]",null,null,null,"generic"]]\n'.encode("ascii"))
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def read_fixture(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def page_count(pdf_bytes):
+    import fitz
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as document:
+        return len(document)
+
+
+def fixtures_of(paths, prefix, suffix=""):
+    return [(name, path) for name, path in paths.items() if name.startswith(prefix) and name.endswith(suffix)]
+
+
+def stage_pdf_classify(paths, options):
+    from utils.pdf_extract import is_pdf_image_based
+    for name, path in fixtures_of(paths, "", ".pdf"):
+        data = read_fixture(path)
+        yield name, page_count(data), "pages", lambda data=data: is_pdf_image_based(data)
+
+
+def stage_pdfplumber(paths, options):
+    from utils.pdf_extract import _analyze_pdfplumber
+    for name, path in fixtures_of(paths, "", ".pdf"):
+        data = read_fixture(path)
+        # Text layer and image boxes of every page, without the pdf2image rasters
+        yield name, page_count(data), "pages", lambda data=data: _analyze_pdfplumber(data)[:2]
+
+
+def stage_rasterize(paths, options):
+    from utils.pdf_extract import analyze_pdf
+
+    def rasterize(data):
+        # The production path: page routing, then the rasters of the OCR pages
+        _, _, rasters = analyze_pdf(data)
+        for _ in rasters or ():
+            pass
+
+    for name, path in fixtures_of(paths, "scan_", ".pdf"):
+        data = read_fixture(path)
+        yield name, page_count(data), "pages", lambda data=data: rasterize(data)
+
+
+def stage_ocr_image(paths, options):
+    try:
+        from bhashaai.extract import extract_text_from_image
+        from utils.ocr import get_shared_reader
+        reader = get_shared_reader()
+    except Exception as e:
+        raise RuntimeError(f"OCR reader not available: {e}") from e
+
+    def ocr(image, run=[0]):
+        # Touch one pixel per run so the page cache never answers
+        array = np.array(image)
+        array.flat[run[0] % array.size] ^= 1
+        run[0] += 1
+        return extract_text_from_image(array, reader)
+
+    for name, path in fixtures_of(paths, "photo_"):
+        image = Image.open(path)
+        image.load()
+        yield name, 1, "images", lambda image=image: ocr(image)
+
+
+def stage_pdf_render(paths, options):
+    from bhashaai.render import generate_pdf_reportlab
+    for name, path in fixtures_of(paths, "hindi_"):
+        text = read_fixture(path).decode("utf-8")
+        yield name, len(text), "chars", lambda text=text: generate_pdf_reportlab(text, "Hindi")
+
+
+def stage_tts(paths, options):
+    from bhashaai.synthesize import speech_text
+    from utils import tts
+
+    prefix = "https://translate.google."
+    tts._session.mount(prefix, StubTTSAdapter(options.tts_latency))
+    try:
+        for name, path in fixtures_of(paths, "hindi_"):
+            text = speech_text(read_fixture(path).decode("utf-8"))
+            if len(text) > options.tts_max_chars:
+                continue
+            yield name, len(text), "chars", lambda text=text: sum(len(chunk) for chunk in tts.gtts_stream(text, "hi"))
+    finally:
+        tts._session.adapters.pop(prefix, None)
+
+
+def stage_explain(paths, options):
+    from bhashaai.languages import LANGUAGE_PROMPTS
+    from utils.explainer import explain_document
+    from utils.groq_api import get_groq_client
+    from utils.pdf_extract import analyze_pdf
+
+    mock = MockGroq(first_token_latency=options.groq_latency, token_latency=options.groq_token_latency)
+    get_groq_client().url = mock.start()
+    try:
+        for name, path in fixtures_of(paths, "text_", ".pdf"):
+            page_texts, _, _ = analyze_pdf(read_fixture(path))
+            text = "\f".join(page_texts)
+            yield name, len(text), "chars", lambda text=text: explain_document(text, "Hindi", LANGUAGE_PROMPTS["Hindi"])
+    finally:
+        mock.stop()
+
+
+STAGES = {
+    "pdf_classify": stage_pdf_classify,  # is_pdf_image_based
+    "pdfplumber": stage_pdfplumber,
+    "rasterize": stage_rasterize,  # analyze_pdf and its OCR page rasters
+    "ocr_image": stage_ocr_image,  # extract_text_from_image
+    "pdf_render": stage_pdf_render,  # generate_pdf_reportlab
+    "tts": stage_tts,  # gtts_stream against StubTTSAdapter
+    "explain": stage_explain,  # explain_document against MockGroq
+}
+
+
+def time_case(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+        if timings[-1] > SLOW_RUN_SECONDS:
+            break
+    return timings
+
+
+def run_stage(name, paths, options, log=print):
+    results = []
+    try:
+        for case, units, unit, function in STAGES[name](paths, options):
+            function()  # Warm-up: imports, font registration, first connection
+            timings = time_case(function, options.repeat)
+            best = min(timings)
+            results.append({
+                "stage": name, "case": case, "runs": len(timings),
+                "min_s": round(best, 4), "median_s": round(statistics.median(timings), 4),
+                "max_s": round(max(timings), 4), "units": units, "unit": unit,
+                "ms_per_unit": round(best * 1000 / units, 4) if units else None
+            })
+            log(f"{name:13} {case:24} {best * 1000:10.1f} ms  ({results[-1]['ms_per_unit']} ms/{unit[:-1]})")
+    except Exception as e:
+        results.append({"stage": name, "skipped": str(e)})
+        log(f"{name:13} skipped: {e}")
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline, current):
+    """Print min-time ratios against a baseline run, flagging regressions"""
+    before = {(r["stage"], r["case"]): r["min_s"] for r in baseline["results"] if "min_s" in r}
+    regressions = 0
+    print(f"\nAgainst {baseline['commit']}:")
+    for result in current["results"]:
+        key = (result.get("stage"), result.get("case"))
+        if "min_s" not in result or key not in before or not before[key]:
+            continue
+        ratio = result["min_s"] / before[key]
+        flag = "  ▲ slower" if ratio > REGRESSION_RATIO else ("  ▼ faster" if ratio < 1 / REGRESSION_RATIO else "")
+        regressions += ratio > REGRESSION_RATIO
+        print(f"{key[0]:13} {key[1]:24} {before[key] * 1000:10.1f} -> {result['min_s'] * 1000:10.1f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {', '.join(STAGES)}")
+    parser.add_argument("--quick", action="store_true", help="skip 100-page and 300 DPI fixtures")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (min is reported)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixture directory, generated on first use")
+    parser.add_argument("--groq-latency", type=float, default=0.5, help="mock Groq seconds to first byte")
+    parser.add_argument("--groq-token-latency", type=float, default=0.0, help="mock Groq seconds per streamed token")
+    parser.add_argument("--tts-latency", type=float, default=0.15, help="stub TTS seconds per request")
+    parser.add_argument("--tts-max-chars", type=int, default=20000, help="skip longer texts in the TTS stage")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    paths = ensure_fixtures(args.fixtures, args.quick)
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {name: value for name, value in vars(args).items() if name not in ("output", "compare")},
+        "results": []
+    }
+    for stage in stages:
+        report["results"].extend(run_stage(stage, paths, args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(json.load(file), report)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""BhashaAI processing core: extract, explain, synthesize and render, without Streamlit
+
+The Streamlit pages, the batch CLI and the HTTP API are thin clients of these
+functions. They return data and report progress through callbacks; failures
+raise ExtractionError, GroqError or TTSError.
+"""
+from bhashaai.explain import explain_stream, explain_text, unexplained_chars
+from bhashaai.extract import ExtractionError, document_kind, extract_document, extract_text_from_image, extract_text_from_pdf
+from bhashaai.languages import LANG_CODES, LANGUAGE_PROMPTS, LANGUAGES, check_language
+from bhashaai.render import render_pdf
+from bhashaai.synthesize import speech_language, synthesize_speech, synthesize_speech_stream
+from utils.groq_api import GroqError
+from utils.tts import TTSError, UnsupportedLanguageError
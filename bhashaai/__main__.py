@@ -0,0 +1,55 @@
+import argparse
+import json
+import os
+import sys
+
+from bhashaai.batch import BATCH_LLM_CONCURRENCY, BATCH_OCR_WORKERS, run_batch
+from bhashaai.languages import LANGUAGES, check_language
+from utils.metrics import set_metrics_log
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bhashaai", description="BhashaAI without the web app")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Explain every document in a folder or manifest")
+    batch.add_argument("source", help="Folder of PDFs/images, or a manifest with one path (or JSON object) per line")
+    batch.add_argument("-l", "--languages", default="Hindi",
+                       help=f"Comma-separated languages ({', '.join(LANGUAGES)})")
+    batch.add_argument("-o", "--output", default="results.jsonl",
+                       help="JSONL results file; existing successes in it are skipped (default: results.jsonl)")
+    batch.add_argument("--artifacts", help="Folder for audio and PDF files")
+    batch.add_argument("--audio", action="store_true", help="Write spoken explanations to --artifacts")
+    batch.add_argument("--pdf", action="store_true", help="Write explanation PDFs to --artifacts")
+    batch.add_argument("--ocr-workers", type=int, help="Extraction processes")
+    batch.add_argument("--llm-concurrency", type=int, help="Explanations requested at once")
+    batch.add_argument("--metrics-log", default="",
+                       help='Write per-stage timing spans as JSON lines to this file ("-" for stderr; default: off)')
+
+    args = parser.parse_args(argv)
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+    for language in languages:
+        try:
+            check_language(language)
+        except ValueError as e:
+            parser.error(str(e))
+    if (args.audio or args.pdf) and not args.artifacts:
+        parser.error("--audio and --pdf need --artifacts")
+    if not os.path.exists(args.source):
+        parser.error(f"{args.source} does not exist")
+
+    # Progress and the summary go to stdout for piping; spans only when asked for
+    set_metrics_log(args.metrics_log)
+    summary = run_batch(
+        args.source, languages, args.output, artifact_dir=args.artifacts, audio=args.audio, pdf=args.pdf,
+        ocr_workers=args.ocr_workers or BATCH_OCR_WORKERS,
+        llm_concurrency=args.llm_concurrency or BATCH_LLM_CONCURRENCY,
+    )
+    print(f"📊 {summary['documents']} documents in {summary['elapsed_seconds']}s "
+          f"({summary['docs_per_minute']} docs/min), {summary['errors']} errors")
+    print(json.dumps(summary))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
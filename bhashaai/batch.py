@@ -0,0 +1,220 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from bhashaai.explain import explain_text, unexplained_chars
+from bhashaai.extract import IMAGE_EXTENSIONS, extract_document
+from bhashaai.languages import check_language
+from bhashaai.render import render_pdf
+from bhashaai.synthesize import speech_language, synthesize_speech
+from utils.fonts import has_font
+from utils.ocr import OCRPool, available_cpus, set_ocr_pool
+
+DOCUMENT_EXTENSIONS = {".pdf"} | IMAGE_EXTENSIONS
+BATCH_OCR_WORKERS = int(os.getenv("BATCH_OCR_WORKERS", max(1, min(4, available_cpus() // 2))))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", 4))
+
+AUDIO_EXTENSIONS = {"audio/mpeg": ".mp3", "audio/wav": ".wav"}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_documents(source):
+    """List (path, languages or None) from a directory tree or a manifest file
+
+    A manifest has one path per line, or JSON lines with "path" and optional
+    "languages"; relative paths are resolved against the manifest's folder.
+    """
+    if os.path.isdir(source):
+        documents = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in DOCUMENT_EXTENSIONS:
+                    documents.append((os.path.join(root, name), None))
+        return documents
+
+    base = os.path.dirname(os.path.abspath(source))
+    documents = []
+    with open(source, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                path, languages = entry["path"], entry.get("languages")
+            else:
+                path, languages = line, None
+            documents.append((os.path.join(base, path), languages))
+    return documents
+
+
+def load_checkpoint(output_path):
+    """(document sha256, language) pairs already explained successfully in output_path"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by an interrupted run
+            if record.get("status") == "ok":
+                done.add((record["sha256"], record["language"]))
+    return done
+
+
+def _init_extract_worker(torch_threads):
+    from utils.ocr import set_torch_threads
+    set_torch_threads(torch_threads)
+    # Each extraction worker uses one OCR reader, so cores are split between workers
+    # rather than between pages
+    set_ocr_pool(OCRPool(mode="serial"))
+
+
+def _extract_job(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    started = time.perf_counter()
+    text = extract_document(data, os.path.basename(path))
+    return text, time.perf_counter() - started
+
+
+def _artifact_stem(path, sha256):
+    stem = re.sub(r"[^\w.-]+", "_", os.path.splitext(os.path.basename(path))[0])
+    return f"{stem}-{sha256[:8]}"
+
+
+def _explain_job(text, language, path, sha256, artifact_dir, audio, pdf):
+    started = time.perf_counter()
+    explanation = explain_text(text, language)
+    if not explanation:
+        raise ValueError("Empty explanation")
+    record = {"explanation": explanation, "explain_seconds": round(time.perf_counter() - started, 3)}
+    skipped = unexplained_chars(text)
+    if skipped:
+        record["skipped_chars"] = skipped
+    artifacts = {}
+    stem = os.path.join(artifact_dir, f"{_artifact_stem(path, sha256)}.{language}") if artifact_dir else None
+    # No PDF for a language without a script font (e.g. Urdu); the fallbacks are unreadable
+    if stem and pdf and has_font(language):
+        pdf_bytes = render_pdf(explanation, language)
+        if pdf_bytes:
+            with open(f"{stem}.pdf", "wb") as file:
+                file.write(pdf_bytes)
+            artifacts["pdf"] = f"{stem}.pdf"
+    if stem and audio:
+        try:
+            audio_bytes, mime = synthesize_speech(explanation, language)
+            audio_path = f"{stem}{AUDIO_EXTENSIONS.get(mime, '.mp3')}"
+            with open(audio_path, "wb") as file:
+                file.write(audio_bytes)
+            artifacts["audio"] = audio_path
+            if speech_language(language) != language:
+                artifacts["audio_language"] = speech_language(language)
+        except Exception as e:
+            # Audio is optional; keep the explanation
+            artifacts["audio_error"] = str(e)
+    if artifacts:
+        record["artifacts"] = artifacts
+    return record
+
+
+def run_batch(source, languages, output_path, artifact_dir=None, audio=False, pdf=False,
+              ocr_workers=BATCH_OCR_WORKERS, llm_concurrency=BATCH_LLM_CONCURRENCY, log=print):
+    """Explain every document under source into each language, appending JSONL records to output_path
+
+    Documents and languages already recorded with status "ok" are skipped, so an
+    interrupted run resumes where it stopped. Returns a summary dict.
+    """
+    for language in languages:
+        check_language(language)
+    if artifact_dir:
+        os.makedirs(artifact_dir, exist_ok=True)
+    done = load_checkpoint(output_path)
+
+    # Work out which documents still have languages to do; a copy of a document
+    # already queued (same bytes, same language) is not explained twice
+    pending = []
+    skipped = 0
+    for path, doc_languages in find_documents(source):
+        sha256 = file_sha256(path)
+        todo = [language for language in dict.fromkeys(doc_languages or languages) if (sha256, language) not in done]
+        done.update((sha256, language) for language in todo)
+        if todo:
+            pending.append((path, sha256, todo))
+        else:
+            skipped += 1
+    log(f"{len(pending)} documents to process, {skipped} already done or duplicated")
+
+    counts = {"documents": 0, "explanations": 0, "errors": 0}
+    started = time.monotonic()
+    torch_threads = max(1, available_cpus() // max(1, ocr_workers))
+    extract_pool = ProcessPoolExecutor(max_workers=ocr_workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_extract_worker, initargs=(torch_threads,))
+    llm_pool = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="batch-llm")
+
+    with open(output_path, "a", encoding="utf-8") as output, extract_pool, llm_pool:
+        def write(record):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+        futures = {}
+        for path, sha256, todo in pending:
+            futures[extract_pool.submit(_extract_job, path)] = ("extract", path, sha256, todo)
+        remaining = {}  # path -> languages still being explained
+
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                kind, path, sha256, detail = futures.pop(future)
+                base = {"path": path, "sha256": sha256}
+                if kind == "extract":
+                    try:
+                        text, seconds = future.result()
+                        if not text:
+                            raise ValueError("No text found")
+                    except Exception as e:
+                        for language in detail:
+                            write(dict(base, language=language, status="error", stage="extract", error=str(e)))
+                        counts["errors"] += len(detail)
+                        counts["documents"] += 1
+                        log(f"✗ {path}: {e}")
+                        continue
+                    remaining[path] = len(detail)
+                    for language in detail:
+                        job = llm_pool.submit(_explain_job, text, language, path, sha256, artifact_dir, audio, pdf)
+                        futures[job] = ("explain", path, sha256, (language, len(text), seconds))
+                else:
+                    language, chars, extract_seconds = detail
+                    try:
+                        record = future.result()
+                        write(dict(base, language=language, status="ok", chars=chars,
+                                   extract_seconds=round(extract_seconds, 3), **record))
+                        counts["explanations"] += 1
+                    except Exception as e:
+                        write(dict(base, language=language, status="error", stage="explain", error=str(e)))
+                        counts["errors"] += 1
+                        log(f"✗ {path} [{language}]: {e}")
+                    remaining[path] -= 1
+                    if not remaining[path]:
+                        counts["documents"] += 1
+                        log(f"✓ {path}")
+
+    elapsed = time.monotonic() - started
+    counts["elapsed_seconds"] = round(elapsed, 2)
+    counts["docs_per_minute"] = round(counts["documents"] / (elapsed / 60), 2) if elapsed > 0 else 0.0
+    counts["skipped"] = skipped
+    return counts
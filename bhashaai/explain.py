@@ -0,0 +1,32 @@
+from bhashaai.languages import LANGUAGE_PROMPTS, check_language
+from utils.explainer import explain_document_cached, explain_document_stream_cached, skipped_chars
+
+
+def explain_stream(text, language):
+    """Yield the explanation of text in language token by token (a cache hit arrives in one piece)
+
+    Raises GroqError when the Groq API cannot produce a completion.
+    """
+    check_language(language)
+    # Long documents are explained chunk-wise and merged, not truncated
+    yield from explain_document_stream_cached(text, language, LANGUAGE_PROMPTS[language])
+
+
+def unexplained_chars(text):
+    """Characters at the end of text beyond the explanation's input budget, which are left out"""
+    return skipped_chars(text)
+
+
+def explain_text(text, language, on_token=None):
+    """Return the explanation of text in language; on_token(token) sees the streamed tokens
+
+    Raises GroqError when the Groq API cannot produce a completion.
+    """
+    check_language(language)
+    if on_token is None:
+        return explain_document_cached(text, language, LANGUAGE_PROMPTS[language])
+    parts = []
+    for token in explain_stream(text, language):
+        on_token(token)
+        parts.append(token)
+    return "".join(parts)
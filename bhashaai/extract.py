@@ -0,0 +1,125 @@
+import os
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from utils.metrics import span
+from utils.ocr import get_ocr_pool, get_shared_reader, read_text
+from utils.ocr_cache import get_ocr_cache
+from utils.pdf_extract import analyze_pdf
+from utils.preprocess import preprocess_image
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+class ExtractionError(Exception):
+    """Raised when no text can be extracted from a document"""
+
+
+def document_kind(filename=None, mime=None):
+    """Return "pdf" or "image" for an upload, from its MIME type or file extension"""
+    if mime == "application/pdf":
+        return "pdf"
+    if mime and mime.startswith("image/"):
+        return "image"
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".pdf":
+        return "pdf"
+    if extension in IMAGE_EXTENSIONS:
+        return "image"
+    raise ExtractionError(f"Unsupported file type: {mime or filename}")
+
+
+def extract_text_from_image(image, reader=None, profile="photo"):
+    """OCR one image (PIL image or array) and return its text
+
+    Identical (or, if enabled, near-identical) images are served from the page cache.
+    """
+    image_array = np.array(image) if isinstance(image, Image.Image) else image
+    ocr_cache = get_ocr_cache()
+    cache_keys = ocr_cache.page_keys(image_array)
+    cached_text = ocr_cache.get_page(cache_keys)
+    if cached_text is not None:
+        return cached_text
+
+    if reader is None:
+        try:
+            reader = get_shared_reader()
+        except Exception as e:
+            raise ExtractionError(f"OCR reader not available: {e}") from e
+
+    with span("ocr_image", profile=profile, width=image_array.shape[1], height=image_array.shape[0]) as fields:
+        # EXIF fix, grayscale, downscale and deskew before OCR
+        extracted_text = read_text(reader, preprocess_image(image, profile))
+        fields["chars"] = len(extracted_text)
+    ocr_cache.set_page(cache_keys, extracted_text)
+    return extracted_text
+
+
+def extract_text_from_pdf(pdf_bytes, progress=None):
+    """Extract text from a PDF, OCRing only the pages without a usable text layer
+
+    progress(done, total) is called with the number of scanned pages OCRed so far,
+    starting with done=0 before the first one.
+    """
+    # One pass classifies every page and keeps the text layer of text pages
+    with span("pdf_analyze", bytes=len(pdf_bytes)) as fields:
+        page_texts, ocr_indices, rasters = analyze_pdf(pdf_bytes)
+        fields.update(pages=len(page_texts), ocr_pages=len(ocr_indices))
+
+    if ocr_indices:
+        if rasters is None:
+            raise ExtractionError(f"{len(ocr_indices)} scanned pages need OCR, but no PDF rasterizer "
+                                  "(PyMuPDF or pdf2image) is available")
+        pool = get_ocr_pool()
+        reader = None
+        if pool.mode == "serial":
+            try:
+                reader = get_shared_reader()
+            except Exception as e:
+                raise ExtractionError(f"OCR reader not available: {e}") from e
+        if progress is not None:
+            progress(0, len(ocr_indices))
+
+        # OCR scanned pages concurrently as they are rasterized; results come back in page order
+        with span("pdf_ocr", pages=len(ocr_indices), mode=pool.mode):
+            ocr_texts = pool.ocr_pages(rasters, reader, progress=progress, total=len(ocr_indices),
+                                       cache=get_ocr_cache())
+        if len(ocr_texts) != len(ocr_indices):
+            raise ExtractionError(f"Only {len(ocr_texts)} of {len(ocr_indices)} scanned pages could be rasterized")
+        for position, index in enumerate(ocr_indices):
+            page_text = ocr_texts[position]
+            page_texts[index] = f"--- Page {index+1} ---\n{page_text}" if page_text else ""
+
+    # Form feed keeps page boundaries for chunked explanation
+    return "\f".join(page_text for page_text in page_texts if page_text).strip()
+
+
+def extract_document(data, filename=None, mime=None, progress=None, use_cache=True):
+    """Return the text of an uploaded PDF or image given its bytes
+
+    Repeat uploads of the same bytes are served from the document-level OCR cache.
+    """
+    kind = document_kind(filename, mime)
+    ocr_cache = get_ocr_cache()
+    with span("extract", kind=kind, bytes=len(data), cached=False) as fields:
+        if use_cache:
+            text = ocr_cache.get_document(data)
+            if text is not None:
+                fields.update(cached=True, chars=len(text))
+                return text
+
+        if kind == "pdf":
+            text = extract_text_from_pdf(data, progress)
+        else:
+            if progress is not None:
+                progress(0, 1)
+            text = extract_text_from_image(Image.open(BytesIO(data)))
+            if progress is not None:
+                progress(1, 1)
+        fields["chars"] = len(text or "")
+
+    if text and use_cache:
+        ocr_cache.set_document(data, text)
+    return text
@@ -0,0 +1,30 @@
+LANGUAGES = [
+    "Hindi", "Marathi", "Bengali", "Telugu", "Tamil",
+    "Urdu", "Gujarati", "Malayalam", "Kannada", "Odia"
+]
+
+# Language instructions
+LANGUAGE_PROMPTS = {
+    "Hindi": "सरल और आसान हिंदी",
+    "Marathi": "सोप्या आणि समजण्यासारख्या मराठीत",
+    "Bengali": "সহজ এবং বোধগম্য বাংলা",
+    "Telugu": "సులభంగా అర్థమయ్యే తెలుగు",
+    "Tamil": "எளிமையான மற்றும் புரிந்துகொள்ளக்கூடிய தமிழ்",
+    "Urdu": "سادہ اور قابل فہم اردو",
+    "Gujarati": "સરળ અને સમજમાં આવતી ગુજરાતી",
+    "Malayalam": "എളുപ്പവും മനസ്സിലാകുന്നതുമായ മലയാളം",
+    "Kannada": "ಸರಳ ಮತ್ತು ಅರ್ಥವಾಗುವ ಕನ್ನಡ",
+    "Odia": "ସହଜ ଓ ବୁଝିପାରିବା ଓଡ଼ିଆ"
+}
+
+LANG_CODES = {
+    "Hindi": "hi", "Marathi": "mr", "Bengali": "bn", "Telugu": "te", "Tamil": "ta",
+    "Urdu": "ur", "Gujarati": "gu", "Malayalam": "ml", "Kannada": "kn", "Odia": "or"
+}
+
+
+def check_language(language):
+    """Raise ValueError for languages BhashaAI does not explain into"""
+    if language not in LANGUAGE_PROMPTS:
+        raise ValueError(f"Unsupported language: {language}. Choose one of {', '.join(LANGUAGES)}")
+    return language
@@ -0,0 +1,252 @@
+from io import BytesIO
+
+from fpdf import FPDF
+
+from bhashaai.languages import check_language
+from utils.fonts import DEVANAGARI_FONT, find_font_file, font_for_language
+from utils.metrics import span
+from utils.normalize import normalize, split_sentences
+from utils.pdf_layout import draw_text, text_width
+
+
+def render_pdf(text, language):
+    """Render an explanation as PDF bytes, or None if every strategy failed"""
+    check_language(language)
+    with span("pdf_render", language=language, chars=len(text)) as fields:
+        pdf_file = generate_pdf(text, language)
+        pdf_bytes = pdf_file.getvalue() if pdf_file is not None else None
+        fields["bytes"] = len(pdf_bytes) if pdf_bytes else 0
+    return pdf_bytes
+
+
+# Robust PDF Generator with comprehensive error handling
+def generate_pdf(text, language="Hindi"):
+    """Generate PDF with multiple fallback strategies"""
+
+    # Strategy 1: Try ReportLab first (if available)
+    try:
+        return generate_pdf_reportlab(text, language)
+    except ImportError:
+        pass  # ReportLab not available
+    except Exception as e:
+        print(f"ReportLab method failed: {str(e)}")
+
+    # Strategy 2: Try FPDF with Unicode support
+    try:
+        return generate_pdf_fpdf_safe(text, language)
+    except Exception as e:
+        print(f"FPDF method failed: {str(e)}")
+
+    # Strategy 3: ASCII-only PDF as last resort
+    try:
+        return generate_ascii_only_pdf(text, language)
+    except Exception as e:
+        print(f"ASCII fallback failed: {str(e)}")
+
+    # Strategy 4: Error PDF (never fails)
+    return create_error_pdf(language, "All PDF generation methods failed")
+
+
+# ASCII-only fallback PDF generator
+def generate_ascii_only_pdf(text, language="Hindi"):
+    """Generate PDF with ASCII-only content as ultimate fallback"""
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=14)
+
+    # ASCII-safe title
+    pdf.cell(0, 15, "BhashaAI - Output", align="C")
+    pdf.ln(20)
+
+    pdf.set_font("Arial", size=12)
+
+    # Convert text to ASCII-safe version (Devanagari words become "?")
+    ascii_text = normalize(text, "ascii")
+
+    if not ascii_text or len(ascii_text.strip()) < 5:
+        ascii_text = "Original content contained non-ASCII characters that cannot be displayed in this PDF format. Please try a different approach or contact support."
+
+    # Write in small chunks
+    chunk_size = 80
+    for i in range(0, len(ascii_text), chunk_size):
+        chunk = ascii_text[i:i+chunk_size]
+        try:
+            pdf.multi_cell(0, 8, chunk)
+            pdf.ln(3)
+        except:
+            pass  # Skip problematic chunks
+
+    # Generate PDF
+    output = BytesIO()
+    pdf_bytes = pdf.output()
+    output.write(pdf_bytes)
+    output.seek(0)
+    return output
+
+
+# Safe FPDF generator with robust encoding handling
+def generate_pdf_fpdf_safe(text, language="Hindi"):
+    """Generate PDF using FPDF with safe encoding handling"""
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    # Always use Arial as fallback to avoid font issues
+    try:
+        font_path = find_font_file(DEVANAGARI_FONT[1])
+        if font_path:
+            pdf.add_font("Noto", "", font_path)
+            pdf.set_font("Noto", size=16)
+            font_name = "Noto"
+        else:
+            raise Exception("Font not found")
+    except Exception as e:
+        # Use Arial as fallback
+        pdf.set_font("Arial", size=16)
+        font_name = "Arial"
+
+    # Title - Convert to ASCII for safety
+    try:
+        title = f"BhashaAI - {language} Output"
+        # Try with Unicode font first
+        if font_name == "Noto":
+            pdf.cell(0, 15, title, align="C")
+        else:
+            # ASCII fallback
+            pdf.cell(0, 15, "BhashaAI - Output", align="C")
+    except:
+        pdf.cell(0, 15, "BhashaAI - Output", align="C")
+
+    pdf.ln(20)
+
+    # Content font
+    try:
+        pdf.set_font(font_name, size=12)
+    except:
+        pdf.set_font("Arial", size=12)
+
+    # Aggressive text preprocessing for encoding safety
+    processed_text = normalize(text, "pdf_safe")
+
+    # If no valid text after processing, create error message
+    if not processed_text or len(processed_text.strip()) < 5:
+        processed_text = "Content could not be processed for PDF generation."
+
+    # Write text with maximum safety
+    try:
+        write_text_to_pdf_safe(pdf, processed_text, font_name)
+    except Exception as e:
+        # Ultimate fallback - ASCII only
+        ascii_text = normalize(processed_text, "ascii")
+        if not ascii_text:
+            ascii_text = "Content contains characters that cannot be displayed in PDF format."
+        pdf.set_font("Arial", size=12)
+        pdf.multi_cell(0, 10, ascii_text)
+
+    # Generate PDF with encoding safety
+    output = BytesIO()
+    try:
+        pdf_bytes = pdf.output()
+        output.write(pdf_bytes)
+        output.seek(0)
+        return output
+    except Exception as e:
+        raise Exception(f"PDF output generation failed: {e}")
+
+
+def write_text_to_pdf_safe(pdf, text, font_name):
+    """Write text to PDF with maximum safety"""
+    if not text:
+        return
+
+    # Arial only covers ASCII
+    if font_name != "Noto":
+        text = normalize(text, "ascii")
+
+    # One multi_cell per sentence, so a sentence that fails to render does not lose the rest
+    for sentence in split_sentences(text):
+        try:
+            pdf.multi_cell(0, 8, sentence.strip())
+            pdf.ln(2)
+        except Exception:
+            # Skip problematic sentences
+            pass
+
+
+# ReportLab PDF generator (better Unicode support)
+def generate_pdf_reportlab(text, language="Hindi"):
+    """Generate PDF using ReportLab for better Unicode support"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+
+    # Font for the language's script, registered on first use
+    font_name = font_for_language(language)
+
+    # Set position and font
+    y_position = height - 80
+    margin = 50
+    line_height = 18
+
+    # Title is ASCII; not every script font carries Latin glyphs
+    p.setFont("Helvetica", 16)
+    title_text = f"BhashaAI - {language} Output"
+    title_width = text_width(title_text, "Helvetica", 16)
+    p.drawString((width - title_width) / 2, y_position, title_text)  # Center manually
+    y_position -= 40
+
+    # Clean text, keeping paragraph breaks
+    clean_text = normalize(text, "pdf")
+
+    # Content: wrapped by measured width and flowed across pages
+    draw_text(p, clean_text, font_name, 12, margin, y_position, width - 2 * margin, line_height,
+              top=height - 50, bottom=50)
+
+    p.save()
+    buffer.seek(0)
+    return buffer
+
+
+# Create error PDF when all else fails
+def create_error_pdf(language="Hindi", error_msg="Unknown error"):
+    """Create a minimal PDF when generation fails"""
+    try:
+        pdf = FPDF()
+        pdf.add_page()
+
+        # Use only ASCII-safe content for error PDF
+        pdf.set_font("Arial", size=14)
+        pdf.cell(0, 15, "BhashaAI - PDF Generation Error", align="C")
+        pdf.ln(25)
+
+        pdf.set_font("Arial", size=12)
+        pdf.multi_cell(0, 10, "Sorry, there was an issue generating the PDF.")
+        pdf.ln(10)
+
+        # Only include ASCII-safe error message
+        safe_error = ''.join(c for c in str(error_msg) if ord(c) < 128)
+        if safe_error:
+            pdf.multi_cell(0, 10, f"Error: {safe_error[:100]}")
+        pdf.ln(10)
+
+        pdf.multi_cell(0, 10, "Suggestions:")
+        pdf.ln(5)
+        pdf.multi_cell(0, 10, "• Try using shorter text")
+        pdf.ln(5)
+        pdf.multi_cell(0, 10, "• Use simpler language")
+        pdf.ln(5)
+        pdf.multi_cell(0, 10, "• Contact support if issue persists")
+
+        output = BytesIO()
+        pdf_bytes = pdf.output()
+        output.write(pdf_bytes)
+        output.seek(0)
+        return output
+
+    except Exception as e:
+        # Ultimate fallback - return None and let UI handle gracefully
+        return None
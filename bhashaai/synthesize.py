@@ -0,0 +1,33 @@
+from bhashaai.languages import LANG_CODES, check_language
+from utils.normalize import normalize
+from utils.tts import supports, synthesize_stream, synthesize_with
+
+# Spoken instead of a language no installed backend can voice (e.g. Odia: gTTS has no
+# "or" voice and espeak-ng is not always installed)
+FALLBACK_SPEECH_LANGUAGE = "Hindi"
+
+
+def speech_text(text):
+    """Explanation text as it is spoken: markdown symbols and invisibles removed"""
+    return normalize(text, "tts")
+
+
+def speech_language(language):
+    """The language speech for language is voiced in: itself, or FALLBACK_SPEECH_LANGUAGE
+    when no available backend supports it. Callers tell the user when the two differ.
+    """
+    check_language(language)
+    return language if supports(LANG_CODES[language]) else FALLBACK_SPEECH_LANGUAGE
+
+
+def synthesize_speech(text, language):
+    """Speak text in language (see speech_language); returns (audio bytes, MIME type)
+
+    Raises TTSError when no backend can voice the language or the fallback.
+    """
+    return synthesize_with(speech_text(text), LANG_CODES[speech_language(language)])
+
+
+def synthesize_speech_stream(text, language):
+    """Yield audio chunks as they are synthesized, for progressive playback"""
+    return synthesize_stream(speech_text(text), LANG_CODES[speech_language(language)])
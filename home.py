@@ -3,14 +3,10 @@ os.environ["STREAMLIT_WATCH_FILE_SYSTEM"] = "false"
 import streamlit as st
 from PIL import Image
 
+from utils.assets import logo_html
+
 # Sidebar Navigation
-st.sidebar.markdown("""
-<div style="text-align: center;">
-    <img src="data:image/gif;base64,{}" width="180">
-</div>
-""".format(
-    __import__('base64').b64encode(open("bhasha_logo.gif", "rb").read()).decode()
-), unsafe_allow_html=True)
+st.sidebar.markdown(logo_html(), unsafe_allow_html=True)
 
 # Page config
 st.set_page_config(page_title="BhashaAI – भारत का अपना ChatGPT", layout="centered")
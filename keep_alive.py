@@ -1,11 +1,15 @@
 import os
 import sys
+import time
 from datetime import datetime, timezone
+from urllib.parse import urlsplit
 
 import requests
 
 
 DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_READY_TIMEOUT_SECONDS = 180
+READY_POLL_INTERVAL_SECONDS = 5
 VALID_STATUSES = {200, 301, 302, 307, 308}
 
 
@@ -27,9 +31,36 @@ def ping(url: str, timeout_seconds: int) -> requests.Response:
     return requests.get(url, headers=headers, timeout=timeout_seconds)
 
 
+def get_readiness_url(target_url: str) -> str:
+    readiness_url = os.getenv("KEEP_ALIVE_READINESS_URL", "").strip()
+    if readiness_url:
+        return readiness_url
+    # Written by utils/warmup.py and served through Streamlit static file serving
+    parts = urlsplit(target_url)
+    return f"{parts.scheme}://{parts.netloc}/app/static/readiness.json"
+
+
+def wait_until_ready(readiness_url: str, timeout_seconds: int, ready_timeout_seconds: int) -> dict:
+    """Poll the warm-up readiness file until the app is ready, failed, or time runs out"""
+    deadline = time.monotonic() + ready_timeout_seconds
+    readiness = {"status": "unknown"}
+    while True:
+        try:
+            response = ping(readiness_url, timeout_seconds)
+            if response.status_code == 200:
+                readiness = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            readiness = {"status": "unknown", "error": str(exc)}
+
+        if readiness.get("status") in ("ready", "failed") or time.monotonic() >= deadline:
+            return readiness
+        time.sleep(READY_POLL_INTERVAL_SECONDS)
+
+
 def main() -> int:
     timestamp = datetime.now(timezone.utc).isoformat()
     timeout_seconds = int(os.getenv("KEEP_ALIVE_TIMEOUT", DEFAULT_TIMEOUT_SECONDS))
+    ready_timeout_seconds = int(os.getenv("KEEP_ALIVE_READY_TIMEOUT", DEFAULT_READY_TIMEOUT_SECONDS))
 
     try:
         target_url = get_target_url()
@@ -44,6 +75,19 @@ def main() -> int:
             print(f"Unexpected status code: {response.status_code}", file=sys.stderr)
             return 1
 
+        # A ping after a cold start boots the server, which starts the model warm-up;
+        # wait for it so the next real user does not pay for the model load
+        readiness_url = get_readiness_url(target_url)
+        readiness = wait_until_ready(readiness_url, timeout_seconds, ready_timeout_seconds)
+        print(
+            f"[{timestamp}] readiness -> {readiness_url} "
+            f"status={readiness.get('status')} warmup={readiness.get('warmup_seconds')}s"
+        )
+
+        if readiness.get("status") == "failed":
+            print(f"Warm-up failed: {readiness.get('error')}", file=sys.stderr)
+            return 1
+
         return 0
     except Exception as exc:
         print(f"[{timestamp}] keep-alive ping failed: {exc}", file=sys.stderr)
@@ -1,219 +1,53 @@
 import os
 import sys
-import textwrap
 os.environ["STREAMLIT_WATCH_FILE_SYSTEM"] = "false"
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-import csv
-from datetime import datetime
 from io import BytesIO
-from fpdf import FPDF
 import streamlit as st
-import requests
-import pdfplumber
-from gtts import gTTS
-from textwrap import wrap
-import numpy as np
 from PIL import Image
-import tempfile
-try:
-    from pdf2image import convert_from_bytes
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-try:
-    import fitz  # PyMuPDF
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
 
-from utils.groq_api import query_groq
+from bhashaai import (LANGUAGES, ExtractionError, GroqError, explain_stream, extract_document,
+                      render_pdf, speech_language, synthesize_speech, unexplained_chars)
+from utils.assets import logo_html
 from utils.visitor_tracker import log_visit, get_today_count
-
-# Text preprocessing function
-def preprocess_text(text):
-    """Clean and preprocess text for better rendering"""
-    # Remove problematic characters
-    text = text.replace('\u200d', '').replace('\u200c', '')  # Zero-width characters
-    text = text.replace('\ufeff', '')  # BOM character
-    text = text.replace('â€™', "'").replace('â€œ', '"').replace('â€', '"')  # Encoding fixes
-    
-    # Normalize whitespace
-    text = ' '.join(text.split())
+from utils.fonts import has_font
+from utils.stages import fingerprint, get_stage, run_stage, set_stage, upload_fingerprint
+from utils.normalize import normalize
+from utils.tts import audio_mime
+from utils.artifacts import ARTIFACT_PREFETCH, artifact_key, build_artifact, has_artifact, open_artifact, submit_artifact
+from utils.warmup import start_warmup
+
+# No-op when serve.py already started it at server start
+start_warmup()
+
+def extract_upload(data, filename, mime):
+    """Extract text from an uploaded file, showing OCR progress
+
+    Returns "" when the file has no text and None on failure, which run_stage
+    does not memoize, so the next rerun tries again.
+    """
+    processing_placeholder = st.empty()
+    processing_placeholder.info("⏳ Please wait, file is processing...")
+    
+    def report_progress(done, total):
+        # Only show page progress for longer documents
+        if done == 0 and total > 1:
+            processing_placeholder.info(f"⏳ Processing {total} scanned pages, please wait...")
+        elif total > 3:
+            processing_placeholder.info(f"⏳ Processed page {done} of {total}...")
     
-    return text
-
-# Font configuration for different languages
-def get_font_for_language(language):
-    """Return appropriate font settings for different languages"""
-    font_configs = {
-        "Hindi": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Marathi": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Bengali": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Telugu": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Tamil": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Urdu": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Gujarati": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Malayalam": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Kannada": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"},
-        "Odia": {"font": "NotoSansDevanagari-Regular.ttf", "encoding": "utf-8"}
-    }
-    return font_configs.get(language, font_configs["Hindi"])
-
-# Initialize OCR reader (cached to avoid reloading)
-@st.cache_resource
-def get_ocr_reader():
-    """Initialize and cache OCR reader"""
     try:
-        import easyocr
-        # Support only English and Hindi for maximum compatibility
-        reader = easyocr.Reader(['en', 'hi'], gpu=False)
-        return reader
-    except Exception as e:
-        st.error(f"Failed to initialize OCR reader: {str(e)}")
+        # Text pages are read from the text layer, scanned pages are OCRed;
+        # repeat uploads of the same file are served from the OCR cache
+        return extract_document(data, filename, mime, progress=report_progress)
+    except ExtractionError as e:
+        st.error(f"⚠️ {e}")
         return None
-
-def extract_text_from_image(image, reader):
-    """Extract text from image using OCR"""
-    try:
-        if reader is None:
-            return "OCR reader not available"
-        
-        # Convert PIL image to numpy array if needed
-        if isinstance(image, Image.Image):
-            image_array = np.array(image)
-        else:
-            image_array = image
-        
-        # Show processing message for images
-        processing_placeholder = st.empty()
-        # processing_placeholder.info("⏳ Extracting text from image...")
-        
-        # Perform OCR silently
-        results = reader.readtext(image_array, detail=0)
-        extracted_text = ' '.join(results)
-        
-        # Clear processing message
-        processing_placeholder.empty()
-        
-        return extracted_text.strip()
     except Exception as e:
-        # Clear processing message on error
-        if 'processing_placeholder' in locals():
-            processing_placeholder.empty()
-        st.error(f"Error extracting text from image: {str(e)}")
-        return ""
-
-def extract_text_from_image_pdf(pdf_bytes, reader):
-    """Extract text from image-based PDF using OCR"""
-    try:
-        if reader is None:
-            return "OCR reader not available"
-        
-        extracted_text = ""
-        
-        # Show processing message
-        processing_placeholder = st.empty()
-        processing_placeholder.info("⏳ Please wait, PDF is processing...")
-        
-        # Try pdf2image first, then PyMuPDF as fallback
-        images = []
-        
-        if PDF2IMAGE_AVAILABLE:
-            try:
-                images = convert_from_bytes(pdf_bytes, dpi=200)
-            except Exception as e:
-                images = []
-        
-        # Fallback to PyMuPDF
-        if not images and PYMUPDF_AVAILABLE:
-            try:
-                images = convert_pdf_pymupdf(pdf_bytes)
-            except Exception as e:
-                processing_placeholder.empty()
-                return ""
-        
-        # If no conversion method worked
-        if not images:
-            processing_placeholder.empty()
-            st.error("Unable to process PDF. Please try a different file.")
-            return ""
-        
-        # Update progress message
-        if len(images) > 1:
-            processing_placeholder.info(f"⏳ Processing {len(images)} pages, please wait...")
-        
-        # Process each page silently
-        for i, image in enumerate(images):
-            # Update progress for multi-page documents
-            if len(images) > 3:  # Only show page progress for longer documents
-                processing_placeholder.info(f"⏳ Processing page {i+1} of {len(images)}...")
-            
-            # Convert PIL image to numpy array if needed
-            if isinstance(image, Image.Image):
-                image_array = np.array(image)
-            else:
-                image_array = image
-            
-            # Extract text from this page
-            page_text = extract_text_from_image(image_array, reader)
-            if page_text:
-                extracted_text += f"\n--- Page {i+1} ---\n{page_text}\n"
-        
-        # Clear processing message
+        st.error(f"Error processing file: {str(e)}")
+        return None
+    finally:
         processing_placeholder.empty()
-        
-        return extracted_text.strip()
-    except Exception as e:
-        # Clear processing message on error
-        if 'processing_placeholder' in locals():
-            processing_placeholder.empty()
-        st.error(f"Error processing PDF: {str(e)}")
-        return ""
-
-def convert_pdf_pymupdf(pdf_bytes):
-    """Convert PDF to images using PyMuPDF (fitz)"""
-    try:
-        # Open PDF from bytes
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        images = []
-        
-        for page_num in range(len(pdf_document)):
-            # Get page
-            page = pdf_document[page_num]
-            
-            # Convert page to image
-            # Higher matrix values = higher resolution
-            mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for better quality
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PIL Image
-            img_data = pix.tobytes("ppm")
-            img = Image.open(BytesIO(img_data))
-            images.append(img)
-        
-        pdf_document.close()
-        return images
-        
-    except Exception as e:
-        raise Exception(f"PyMuPDF conversion failed: {str(e)}")
-
-def is_pdf_image_based(pdf_bytes):
-    """Check if PDF is image-based (scanned) or text-based"""
-    try:
-        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-            text_content = ""
-            # Check first few pages for text content
-            pages_to_check = min(3, len(pdf.pages))
-            
-            for i in range(pages_to_check):
-                page_text = pdf.pages[i].extract_text()
-                if page_text:
-                    text_content += page_text.strip()
-            
-            # If very little text found, likely image-based
-            return len(text_content.strip()) < 50
-    except:
-        return True  # Assume image-based if can't read normally
 
 # Streamlit Page Config
 st.set_page_config(page_title="BhashaAI", layout="wide")
@@ -222,13 +56,7 @@ st.set_page_config(page_title="BhashaAI", layout="wide")
 log_visit()
 
 # Sidebar Layout
-st.sidebar.markdown("""
-<div style="text-align:  center;">
-    <img src="data:image/gif;base64,{}" width="180">
-</div>
-""".format(
-    __import__('base64').b64encode(open("bhasha_logo.gif", "rb").read()).decode()
-), unsafe_allow_html=True)
+st.sidebar.markdown(logo_html(), unsafe_allow_html=True)
 
 st.sidebar.markdown("### 🎯 Supported Formats")
 st.sidebar.markdown("**PDFs:** Text & Image-based")
@@ -499,52 +327,37 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Language options
-language = st.selectbox("🗣️ Select Output Language", [
-    "Hindi", "Marathi", "Bengali", "Telugu", "Tamil",
-    "Urdu", "Gujarati", "Malayalam", "Kannada", "Odia"
-])
+language = st.selectbox("🗣️ Select Output Language", LANGUAGES)
 
 input_method = st.radio("📥 Choose Input Method", ["Upload PDF or Image", "Paste Text"])
 text = ""
 
-# Initialize OCR reader
-ocr_reader = None
-
 # Handle input
 if input_method == "Upload PDF or Image":
     uploaded_file = st.file_uploader("Upload a PDF or Image file", type=["pdf", "jpg", "jpeg", "png"])
     if uploaded_file:
         file_type = uploaded_file.type
+        # Reruns (e.g. a language switch) reuse the extracted text of an unchanged upload
+        upload_key = upload_fingerprint(uploaded_file)
+        
+        def extract_file():
+            return extract_upload(uploaded_file.getvalue(), uploaded_file.name, file_type)
         
         if file_type == "application/pdf":
             # Handle PDF file
-            pdf_bytes = uploaded_file.read()
-            
-            # Check if PDF is image-based or text-based
-            if is_pdf_image_based(pdf_bytes):
-                ocr_reader = get_ocr_reader()
-                text = extract_text_from_image_pdf(pdf_bytes, ocr_reader)
-            else:
-                try:
-                    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-                        for page in pdf.pages:
-                            page_text = page.extract_text()
-                            if page_text:
-                                text += page_text
-                except Exception as e:
-                    ocr_reader = get_ocr_reader()
-                    text = extract_text_from_image_pdf(pdf_bytes, ocr_reader)
+            text = run_stage("extract", upload_key, extract_file)
         
         else:
             # Handle image file
             try:
-                ocr_reader = get_ocr_reader()
-                # Display a small thumbnail of the uploaded image
-                image = Image.open(uploaded_file)
+                def make_thumbnail():
+                    # Create a small thumbnail
+                    thumbnail = Image.open(BytesIO(uploaded_file.getvalue()))
+                    thumbnail.thumbnail((150, 150))  # Max 150x150 pixels
+                    return thumbnail
                 
-                # Create a small thumbnail
-                thumbnail = image.copy()
-                thumbnail.thumbnail((150, 150))  # Max 150x150 pixels
+                # Display a small thumbnail of the uploaded image
+                thumbnail = run_stage("thumbnail", upload_key, make_thumbnail)
                 
                 # Show thumbnail with filename
                 col1, col2 = st.columns([1, 4])
@@ -554,17 +367,13 @@ if input_method == "Upload PDF or Image":
                     st.write(f"**File:** {uploaded_file.name}")
                     st.write(f"**Type:** {uploaded_file.type}")
                 
-                # Show processing message
-                st.info("⏳ Image is processing, please wait...")
-                
-                # Extract text from image using OCR
-                text = extract_text_from_image(image, ocr_reader)
+                text = run_stage("extract", upload_key, extract_file)
                 
                 if text:
                     st.success(f"✅ Extracted {len(text)} characters from image")
                     with st.expander("📝 Extracted Text Preview"):
                         st.text_area("Extracted text:", text, height=150, disabled=True)
-                else:
+                elif text is not None:
                     st.warning("⚠️ No text found in the image")
                     
             except Exception as e:
@@ -573,476 +382,110 @@ if input_method == "Upload PDF or Image":
 else:
     text = st.text_area("Paste your content here", height=200)
 
-# Language instructions
-language_prompts = {
-    "Hindi": "सरल और आसान हिंदी",
-    "Marathi": "सोप्या आणि समजण्यासारख्या मराठीत",
-    "Bengali": "সহজ এবং বোধগম্য বাংলা",
-    "Telugu": "సులభంగా అర్థమయ్యే తెలుగు",
-    "Tamil": "எளிமையான மற்றும் புரிந்துகொள்ளக்கூடிய தமிழ்",
-    "Urdu": "سادہ اور قابل فہم اردو",
-    "Gujarati": "સરળ અને સમજમાં આવતી ગુજરાતી",
-    "Malayalam": "എളുപ്പവും മനസ്സിലാകുന്നതുമായ മലയാളം",
-    "Kannada": "ಸರಳ ಮತ್ತು ಅರ್ಥವಾಗುವ ಕನ್ನಡ",
-    "Odia": "ସହଜ ଓ ବୁଝିପାରିବା ଓଡ଼ିଆ"
-}
-
-lang_codes = {
-    "Hindi": "hi", "Marathi": "mr", "Bengali": "bn", "Telugu": "te", "Tamil": "ta",
-    "Urdu": "ur", "Gujarati": "gu", "Malayalam": "ml", "Kannada": "kn", "Odia": "hi"  # Odia not supported by gTTS, fallback to Hindi
-}
-
-# Robust PDF Generator with comprehensive error handling
-def generate_pdf(text, language="Hindi"):
-    """Generate PDF with multiple fallback strategies"""
-    
-    # Strategy 1: Try ReportLab first (if available)
-    try:
-        return generate_pdf_reportlab(text, language)
-    except ImportError:
-        pass  # ReportLab not available
-    except Exception as e:
-        st.warning(f"ReportLab method failed: {str(e)}")
-    
-    # Strategy 2: Try FPDF with Unicode support
-    try:
-        return generate_pdf_fpdf_safe(text, language)
-    except Exception as e:
-        st.warning(f"FPDF method failed: {str(e)}")
-    
-    # Strategy 3: ASCII-only PDF as last resort
-    try:
-        return generate_ascii_only_pdf(text, language)
-    except Exception as e:
-        st.warning(f"ASCII fallback failed: {str(e)}")
-    
-    # Strategy 4: Error PDF (never fails)
-    return create_error_pdf(language, "All PDF generation methods failed")
-
-# ASCII-only fallback PDF generator
-def generate_ascii_only_pdf(text, language="Hindi"):
-    """Generate PDF with ASCII-only content as ultimate fallback"""
-    
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=14)
-    
-    # ASCII-safe title
-    pdf.cell(0, 15, "BhashaAI - Output", align="C")
-    pdf.ln(20)
-    
-    pdf.set_font("Arial", size=12)
-    
-    # Convert text to ASCII-safe version
-    ascii_text = ""
-    for char in text:
-        if ord(char) < 128:
-            ascii_text += char
-        elif char in 'नमस्तेकमैंहूसरकारभारतीयहिंदीमराठीबंगालीतमिलतेलुगुगुजरातीमलयालमकन्नडओडिया':
-            ascii_text += "?"  # Replace Indian chars with ?
-        else:
-            ascii_text += " "
-    
-    # Clean up the text
-    ascii_text = ' '.join(ascii_text.split())
-    
-    if not ascii_text or len(ascii_text.strip()) < 5:
-        ascii_text = "Original content contained non-ASCII characters that cannot be displayed in this PDF format. Please try a different approach or contact support."
-    
-    # Write in small chunks
-    chunk_size = 80
-    for i in range(0, len(ascii_text), chunk_size):
-        chunk = ascii_text[i:i+chunk_size]
-        try:
-            pdf.multi_cell(0, 8, chunk)
-            pdf.ln(3)
-        except:
-            pass  # Skip problematic chunks
-    
-    # Generate PDF
-    output = BytesIO()
-    pdf_bytes = pdf.output()
-    output.write(pdf_bytes)
-    output.seek(0)
-    return output
-
-# Safe FPDF generator with robust encoding handling
-def generate_pdf_fpdf_safe(text, language="Hindi"):
-    """Generate PDF using FPDF with safe encoding handling"""
-    
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Always use Arial as fallback to avoid font issues
-    try:
-        font_path = os.path.join("assets", "NotoSansDevanagari-Regular.ttf")
-        if os.path.exists(font_path):
-            pdf.add_font("Noto", "", font_path)
-            pdf.set_font("Noto", size=16)
-            font_name = "Noto"
-        else:
-            raise Exception("Font not found")
-    except Exception as e:
-        # Use Arial as fallback
-        pdf.set_font("Arial", size=16)
-        font_name = "Arial"
-    
-    # Title - Convert to ASCII for safety
-    try:
-        title = f"BhashaAI - {language} Output"
-        # Try with Unicode font first
-        if font_name == "Noto":
-            pdf.cell(0, 15, title, align="C")
-        else:
-            # ASCII fallback
-            pdf.cell(0, 15, "BhashaAI - Output", align="C")
-    except:
-        pdf.cell(0, 15, "BhashaAI - Output", align="C")
-    
-    pdf.ln(20)
-    
-    # Content font
-    try:
-        pdf.set_font(font_name, size=12)
-    except:
-        pdf.set_font("Arial", size=12)
-    
-    # Aggressive text preprocessing for encoding safety
-    processed_text = preprocess_text_for_pdf_safe(text)
-    
-    # If no valid text after processing, create error message
-    if not processed_text or len(processed_text.strip()) < 5:
-        processed_text = "Content could not be processed for PDF generation."
-    
-    # Write text with maximum safety
-    try:
-        write_text_to_pdf_safe(pdf, processed_text, font_name)
-    except Exception as e:
-        # Ultimate fallback - ASCII only
-        ascii_text = ''.join(c for c in processed_text if ord(c) < 128)
-        if not ascii_text:
-            ascii_text = "Content contains characters that cannot be displayed in PDF format."
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, ascii_text)
-    
-    # Generate PDF with encoding safety
-    output = BytesIO()
-    try:
-        pdf_bytes = pdf.output()
-        output.write(pdf_bytes)
-        output.seek(0)
-        return output
-    except Exception as e:
-        raise Exception(f"PDF output generation failed: {e}")
-
-def preprocess_text_for_pdf_safe(text):
-    """Ultra-safe text preprocessing for PDF compatibility"""
-    if not text:
-        return ""
-    
-    # Remove ALL problematic Unicode characters
-    safe_chars = []
-    for char in text:
-        try:
-            # Test if character is safe
-            char_code = ord(char)
-            
-            # Keep basic Latin, extended Latin, and Devanagari ranges
-            if (
-                (0x0020 <= char_code <= 0x007E) or  # Basic Latin
-                (0x00A0 <= char_code <= 0x00FF) or  # Latin-1 Supplement
-                (0x0900 <= char_code <= 0x097F) or  # Devanagari
-                char in ' \n\r\t।'  # Safe whitespace and punctuation
-            ):
-                safe_chars.append(char)
-            else:
-                safe_chars.append(' ')  # Replace with space
-        except:
-            safe_chars.append(' ')
-    
-    text = ''.join(safe_chars)
-    
-    # Fix common encoding issues
-    replacements = {
-        'â€™': "'", 'â€œ': '"', 'â€': '"', 'â€˜': "'",
-        'Ã¡': 'á', 'Ã©': 'é', 'Ã­': 'í', 'Ã³': 'ó', 'Ãº': 'ú'
-    }
-    
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-    
-    # Normalize whitespace
-    text = ' '.join(text.split())
-    
-    return text.strip()
-
-def write_text_to_pdf_safe(pdf, text, font_name):
-    """Write text to PDF with maximum safety"""
-    if not text:
-        return
-    
-    # Split into small, manageable chunks
-    max_chunk_size = 50  # Very conservative
-    
-    # Split by sentences first
-    sentences = text.replace('।', '।\n').replace('.', '.\n').split('\n')
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        
-        # Break long sentences into smaller chunks
-        words = sentence.split()
-        current_chunk = ""
-        
-        for word in words:
-            test_chunk = current_chunk + " " + word if current_chunk else word
-            
-            if len(test_chunk) <= max_chunk_size:
-                current_chunk = test_chunk
-            else:
-                # Write current chunk
-                if current_chunk:
-                    try:
-                        if font_name == "Noto":
-                            pdf.multi_cell(0, 8, current_chunk.strip())
-                        else:
-                            # For Arial, ensure ASCII only
-                            ascii_chunk = ''.join(c for c in current_chunk if ord(c) < 128)
-                            if ascii_chunk:
-                                pdf.multi_cell(0, 8, ascii_chunk.strip())
-                        pdf.ln(2)
-                    except Exception as e:
-                        # Skip problematic chunks
-                        pass
-                current_chunk = word
-        
-        # Write remaining chunk
-        if current_chunk:
-            try:
-                if font_name == "Noto":
-                    pdf.multi_cell(0, 8, current_chunk.strip())
-                else:
-                    ascii_chunk = ''.join(c for c in current_chunk if ord(c) < 128)
-                    if ascii_chunk:
-                        pdf.multi_cell(0, 8, ascii_chunk.strip())
-                pdf.ln(2)
-            except:
-                pass
-
-# ReportLab PDF generator (better Unicode support)
-def generate_pdf_reportlab(text, language="Hindi"):
-    """Generate PDF using ReportLab for better Unicode support"""
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    
-    # Register font
-    font_path = os.path.join("assets", "NotoSansDevanagari-Regular.ttf")
-    if not os.path.exists(font_path):
-        raise FileNotFoundError("Font file missing")
-        
-    pdfmetrics.registerFont(TTFont('Noto', font_path))
-    
-    # Set position and font
-    y_position = height - 80
-    margin = 50
-    line_height = 18
-    
-    # Title - Fix the method name
-    p.setFont("Noto", 16)
-    title_text = f"BhashaAI - {language} Output"
-    title_width = p.stringWidth(title_text, "Noto", 16)
-    p.drawString((width - title_width) / 2, y_position, title_text)  # Center manually
-    y_position -= 40
-    
-    # Content
-    p.setFont("Noto", 12)
-    
-    # Clean text
-    clean_text = text.replace('\u200d', '').replace('\u200c', '').replace('\ufeff', '')
-    clean_text = ' '.join(clean_text.split())
-    
-    # Split into lines
-    max_chars_per_line = 70
-    words = clean_text.split(' ')
-    lines = []
-    current_line = ""
-    
-    for word in words:
-        if len(current_line + " " + word) <= max_chars_per_line:
-            current_line = current_line + " " + word if current_line else word
-        else:
-            if current_line:
-                lines.append(current_line)
-            current_line = word
-    
-    if current_line:
-        lines.append(current_line)
-    
-    # Draw lines
-    for line in lines:
-        if y_position < 50:
-            p.showPage()
-            p.setFont("Noto", 12)
-            y_position = height - 50
-        
-        try:
-            p.drawString(margin, y_position, line)
-            y_position -= line_height
-        except:
-            # Skip problematic lines
-            y_position -= line_height
-    
-    p.save()
-    buffer.seek(0)
-    return buffer
-
-# Simple fallback PDF generator with better error handling
-def generate_simple_text_pdf(text, language="Hindi"):
-    """Fallback method using basic text handling"""
-    try:
-        pdf = FPDF()
-        pdf.add_page()
-        
-        font_path = os.path.join("assets", "NotoSansDevanagari-Regular.ttf")
-        if os.path.exists(font_path):
-            try:
-                pdf.add_font("Noto", "", font_path)
-                pdf.set_font("Noto", size=12)
-            except:
-                # If font fails, use Arial
-                pdf.set_font("Arial", size=12)
-        else:
-            # Use built-in font as last resort
-            pdf.set_font("Arial", size=12)
-        
-        pdf.cell(0, 15, f"BhashaAI - {language} Output", align="C")
-        pdf.ln(20)
-        
-        # Very simple text handling - convert to ASCII-safe format
-        try:
-            # Remove non-ASCII characters for fallback
-            clean_text = ''.join(c for c in text if ord(c) < 128)
-            if not clean_text:
-                clean_text = "Content could not be converted to PDF format."
-        except:
-            clean_text = "Content could not be converted to PDF format."
-        
-        # Break into small chunks
-        chunk_size = 60
-        for i in range(0, len(clean_text), chunk_size):
-            chunk = clean_text[i:i+chunk_size]
-            try:
-                pdf.multi_cell(0, 10, chunk)
-                pdf.ln(3)
-            except:
-                pass
-        
-        output = BytesIO()
-        pdf_bytes = pdf.output()
-        output.write(pdf_bytes)
-        output.seek(0)
-        return output
-        
-    except Exception as e:
-        st.error(f"Fallback PDF generation error: {str(e)}")
-        # Return a minimal PDF instead of None
-        return create_error_pdf(language)
-
-# Create error PDF when all else fails
-def create_error_pdf(language="Hindi", error_msg="Unknown error"):
-    """Create a minimal PDF when generation fails"""
-    try:
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Use only ASCII-safe content for error PDF
-        pdf.set_font("Arial", size=14)
-        pdf.cell(0, 15, "BhashaAI - PDF Generation Error", align="C")
-        pdf.ln(25)
-        
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, "Sorry, there was an issue generating the PDF.")
-        pdf.ln(10)
-        
-        # Only include ASCII-safe error message
-        safe_error = ''.join(c for c in str(error_msg) if ord(c) < 128)
-        if safe_error:
-            pdf.multi_cell(0, 10, f"Error: {safe_error[:100]}")
-        pdf.ln(10)
-        
-        pdf.multi_cell(0, 10, "Suggestions:")
-        pdf.ln(5)
-        pdf.multi_cell(0, 10, "• Try using shorter text")
-        pdf.ln(5)
-        pdf.multi_cell(0, 10, "• Use simpler language")
-        pdf.ln(5)
-        pdf.multi_cell(0, 10, "• Contact support if issue persists")
-        
-        output = BytesIO()
-        pdf_bytes = pdf.output()
-        output.write(pdf_bytes)
-        output.seek(0)
-        return output
-        
-    except Exception as e:
-        # Ultimate fallback - return None and let UI handle gracefully
-        return None
-
 # Process and generate output automatically when text is available
 def process_and_generate_output(text, language):
     """Process text and generate output automatically"""
-    with st.spinner(f"Generating explanation in {language}..."):
-        lang_prompt = language_prompts.get(language, language)
-        prompt = f"""
-तुम एक सहायक हो जो भारत के नागरिकों की सहायता करता है। कृपया नीचे दी गई सामग्री को {lang_prompt} में समझाओ ताकि सभी लोग उसे आसानी से समझ सकें।
-
-सामग्री:
-{text[:3000]}
-"""
-        output = query_groq(prompt, language)
+    st.subheader(f"🔍 {language} में व्याख्या:")
+    
+    # Only documents past the explanation token budget lose their tail; say so
+    skipped = unexplained_chars(text)
+    if skipped:
+        st.warning(f"⚠️ दस्तावेज़ बहुत लंबा है: अंतिम {skipped:,} अक्षर ({min(100, skipped * 100 // len(text))}%) की व्याख्या नहीं की गई।")
+
+    # A rerun with the same text and language re-displays the memoized explanation
+    explain_key = fingerprint("explain", text, language)
+    output = get_stage("explain", explain_key)
+    if output is not None:
+        st.write(output)
+    else:
+        status = st.empty()
+        status.info(f"⏳ Generating explanation in {language}...")
+        
+        def stream_tokens():
+            # Long documents are explained chunk-wise and merged, not truncated;
+            # the final completion is streamed so the first words show up immediately
+            first_token = True
+            for token in explain_stream(text, language):
+                if first_token:
+                    status.empty()
+                    first_token = False
+                yield token
+        
+        explanation = st.empty()
+        try:
+            with explanation:
+                output = st.write_stream(stream_tokens())
+        except GroqError as e:
+            st.error(f"❌ {e}")
+            output = None
+        status.empty()
         if output:
-            # Preprocess the output text
-            output = preprocess_text(output)
-            
-            st.subheader(f"🔍 {language} में व्याख्या:")
-            st.write(output)
-
-            # PDF Download - Only for Hindi and Marathi (Devanagari script supported)
-            if language in ["Hindi", "Marathi"]:
-                pdf_file = generate_pdf(output, language)
+            # Tokens are shown raw while streaming; the cleaned text replaces them and is kept
+            output = normalize(output, "display")
+            explanation.write(output)
+            set_stage("explain", explain_key, output)
+
+    # TTS and PDF are built only on request (or prefetched after the stream completes)
+    if output:
+        def build_pdf():
+            return render_pdf(output, language)
+        
+        def synthesize_audio():
+            # Backend chosen per language by TTS_BACKENDS priority and measured latency
+            audio, _ = synthesize_speech(output, language)
+            return audio
+        
+        pdf_key = artifact_key("pdf", output, language)
+        audio_key = artifact_key("audio", output, language)
+        # Artifacts a user asked for stay visible across reruns
+        requested = st.session_state.setdefault("requested_artifacts", set())
+        
+        if ARTIFACT_PREFETCH:
+            if has_font(language):
+                submit_artifact(pdf_key, build_pdf)
+            submit_artifact(audio_key, synthesize_audio)
+
+        # PDF Download - available for every language whose script font is installed
+        if has_font(language):
+            if (pdf_key in requested or has_artifact(pdf_key)
+                    or st.button("📄 Prepare PDF", key=f"pdf-{pdf_key}")):
+                requested.add(pdf_key)
+                with st.spinner("Preparing PDF..."):
+                    pdf_ready = build_artifact(pdf_key, build_pdf)
+                pdf_file = open_artifact(pdf_key) if pdf_ready else None
                 if pdf_file is not None:
-                    st.download_button(
-                        label="⬇️ Download as PDF",
-                        data=pdf_file,
-                        file_name="bhashaai_output.pdf",
-                        mime="application/pdf"
-                    )
+                    with pdf_file:
+                        st.download_button(
+                            label="⬇️ Download as PDF",
+                            data=pdf_file,
+                            file_name="bhashaai_output.pdf",
+                            mime="application/pdf"
+                        )
                 else:
                     st.error("⚠️ Could not generate PDF. Please try again.")
-            else:
-                # Show info for non-Devanagari languages
-                st.info(f"💡 PDF download is currently available only for Hindi and Marathi. {language} content is displayed above with voice support.")
+        else:
+            # Font for this script is not installed on the server
+            st.info(f"💡 PDF download for {language} is not available on this server. {language} content is displayed above with voice support.")
 
-            # Voice Support (available for all languages)
+        # Voice Support (available for all languages)
+        if (audio_key in requested or has_artifact(audio_key)
+                or st.button("🔊 Listen", key=f"audio-{audio_key}")):
+            requested.add(audio_key)
             try:
-                lang_code = lang_codes.get(language, "hi")
-                # Special handling for Odia
-                if language == "Odia":
-                    st.info("🔊 Voice output for Odia will be in Hindi due to technical limitations.")
-                
-                tts = gTTS(output, lang=lang_code)
-                audio_bytes = BytesIO()
-                tts.write_to_fp(audio_bytes)
-                audio_bytes.seek(0)
-                st.audio(audio_bytes, format="audio/mp3")
+                voice = speech_language(language)
+                if voice != language:
+                    st.info(f"🔊 Voice output for {language} will be in {voice}: no speech engine on this server supports {language}.")
+
+                with st.spinner("Generating voice output..."):
+                    build_artifact(audio_key, synthesize_audio)
+                audio_file = open_artifact(audio_key)
+                if audio_file is None:
+                    raise RuntimeError("Audio artifact unavailable")
+                with audio_file:
+                    # MP3 from gTTS, WAV from the local espeak backend
+                    audio_format = audio_mime(audio_file.read(4))
+                    audio_file.seek(0)
+                    st.audio(audio_file, format=audio_format)
             except Exception as e:
                 st.warning("⚠️ Could not generate voice output for this language.")
                 # Don't show the full exception to users, just log it
@@ -1051,7 +494,10 @@ def process_and_generate_output(text, language):
 # Main Logic
 if input_method == "Upload PDF or Image":
     # For upload method
-    if uploaded_file and text.strip():
+    if uploaded_file and text is None:
+        # Extraction failed and the error is already shown; a rerun retries it
+        pass
+    elif uploaded_file and text.strip():
         # File uploaded and text extracted - automatically process
         process_and_generate_output(text, language)
     elif not uploaded_file:
@@ -1070,6 +516,9 @@ elif input_method == "Paste Text":
         else:
             # No text entered - show error message
             st.error("⚠️ कृपया पहले टेक्स्ट बॉक्स में कुछ लिखें या पेस्ट करें।")
+    elif text.strip() and get_stage("explain", fingerprint("explain", text, language)) is not None:
+        # Keep showing the last explanation (and requested PDF/voice) across reruns
+        process_and_generate_output(text, language)
     
     # Show helper text when no text is entered
     if not text.strip():
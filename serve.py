@@ -0,0 +1,32 @@
+"""
+Production entry point: starts the background warm-up, then the Streamlit server.
+
+Usage: python serve.py [streamlit server options], e.g.
+    python serve.py --server.port $PORT --server.address 0.0.0.0
+"""
+
+import os
+import sys
+
+os.environ["STREAMLIT_WATCH_FILE_SYSTEM"] = "false"
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from streamlit.web import cli as stcli
+
+from utils.metrics import start_metrics_server
+from utils.warmup import start_warmup
+
+APP_SCRIPT = os.path.join("pages", "app.py")
+
+
+def main() -> int:
+    # Streamlit runs page scripts in this same process, so the app sees the warmed models
+    start_warmup()
+    # Streamlit cannot add routes, so /metrics gets its own port when METRICS_PORT is set
+    start_metrics_server()
+    sys.argv = ["streamlit", "run", APP_SCRIPT, *sys.argv[1:]]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,241 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
+from utils.cache import CACHE_DIR, CacheStats, make_key
+from utils.metrics import registry
+
+# Artifacts (MP3, PDF) are only built when a user asks for them. With
+# ARTIFACT_PREFETCH=1 they are also started in the background right after the
+# explanation is shown, trading some wasted work for an instant download.
+ARTIFACT_PREFETCH = os.getenv("ARTIFACT_PREFETCH", "0") == "1"
+ARTIFACT_WORKERS = int(os.getenv("ARTIFACT_WORKERS", 2))
+
+# Byte budgets for the artifact store; set ARTIFACT_DIR="" to keep artifacts in memory only
+ARTIFACT_MEMORY_BYTES = int(os.getenv("ARTIFACT_MEMORY_BYTES", 64 * 1024 * 1024))
+ARTIFACT_DISK_BYTES = int(os.getenv("ARTIFACT_DISK_BYTES", 512 * 1024 * 1024))
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(CACHE_DIR, "artifacts"))
+
+
+class ArtifactStore:
+    """Byte-budgeted LRU store for generated files: a memory tier plus an optional disk directory
+
+    The disk tier is shared by all worker processes; each process evicts the
+    least recently used files (by mtime) once the directory exceeds its budget.
+    """
+
+    def __init__(self, memory_budget=ARTIFACT_MEMORY_BYTES, disk_dir=ARTIFACT_DIR, disk_budget=ARTIFACT_DISK_BYTES):
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+        registry.register_cache("artifacts", self.stats)
+        self.disk_dir = None
+        self._disk_bytes = 0
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+                self.disk_dir = disk_dir
+                self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+            except OSError as e:
+                print(f"Artifact store: disk tier disabled ({e})")
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key)
+
+    def _disk_entries(self):
+        entries = []
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _remember(self, key, data):
+        # Caller holds the lock
+        if len(data) > self.memory_budget:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_budget:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        # Other processes write here too, so rescan before evicting
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def put(self, key, data):
+        with self._lock:
+            self._remember(key, data)
+        if self.disk_dir is not None and len(data) <= self.disk_budget:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as file:
+                    file.write(data)
+                # An overwritten file's bytes leave the directory along with it
+                try:
+                    replaced = os.path.getsize(path)
+                except OSError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                with self._lock:
+                    self._disk_bytes += len(data) - replaced
+                    if self._disk_bytes > self.disk_budget:
+                        self._evict_disk()
+            except OSError as e:
+                print(f"Artifact store: disk write failed ({e})")
+        self.stats.record("sets")
+
+    def get(self, key):
+        """Return artifact bytes, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats.record("memory_hits")
+                return data
+        if self.disk_dir is not None:
+            try:
+                path = self._path(key)
+                with open(path, "rb") as file:
+                    data = file.read()
+                os.utime(path)  # Mark as recently used for LRU eviction
+                with self._lock:
+                    self._remember(key, data)
+                self.stats.record("disk_hits")
+                return data
+            except OSError:
+                pass
+        self.stats.record("misses")
+        return None
+
+    def open(self, key):
+        """Return a readable file object for the artifact without loading disk entries into memory"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats.record("memory_hits")
+                return BytesIO(data)
+        if self.disk_dir is not None:
+            try:
+                path = self._path(key)
+                file = open(path, "rb")
+                os.utime(path)
+                self.stats.record("disk_hits")
+                return file
+            except OSError:
+                pass
+        self.stats.record("misses")
+        return None
+
+    def contains(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self.disk_dir is not None and os.path.exists(self._path(key))
+
+    def size_stats(self):
+        with self._lock:
+            stats = {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_budget": self.memory_budget,
+                "disk_bytes": self._disk_bytes,
+                "disk_budget": self.disk_budget if self.disk_dir else 0
+            }
+        stats.update(self.stats.as_dict())
+        return stats
+
+
+artifact_store = ArtifactStore()
+_inflight = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=ARTIFACT_WORKERS, thread_name_prefix="artifact")
+
+
+def artifact_key(kind, text, language):
+    """Key of an artifact: its type plus a hash of the output text and language"""
+    return make_key("artifact", kind, text, language)
+
+
+def has_artifact(key):
+    return artifact_store.contains(key)
+
+
+def open_artifact(key):
+    """Readable file object for a finished artifact (for st.download_button / st.audio), or None"""
+    return artifact_store.open(key)
+
+
+def _store(key, build):
+    data = build()
+    if data:
+        artifact_store.put(key, data)
+    return data
+
+
+def submit_artifact(key, build):
+    """Start build() in the background unless the artifact is stored or already being built"""
+    if artifact_store.contains(key):
+        return None
+    with _lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _executor.submit(_store, key, build)
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _forget(key))
+    return future
+
+
+def _forget(key):
+    with _lock:
+        _inflight.pop(key, None)
+
+
+def build_artifact(key, build):
+    """Ensure the artifact exists: stored, awaited from a build already running, or built now
+
+    A build started here is registered like a background one, so concurrent sessions
+    asking for the same key wait for it instead of building it again.
+    Returns True when the artifact is available through open_artifact.
+    """
+    if artifact_store.contains(key):
+        return True
+    with _lock:
+        future = _inflight.get(key)
+        building = future is None
+        if building:
+            future = _inflight[key] = Future()
+    if building:
+        try:
+            future.set_result(_store(key, build))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            _forget(key)
+    return bool(future.result())
+
+
+def artifact_stats():
+    return artifact_store.size_stats()
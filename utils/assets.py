@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import mimetypes
+import os
+import shutil
+import sys
+import threading
+from functools import lru_cache
+
+import streamlit as st
+
+LOGO_FILE = "bhasha_logo.gif"
+LOGO_WIDTH = 180  # CSS pixels in the sidebar
+# Set LOGO_OPTIMIZE=0 to always serve the original GIF
+LOGO_OPTIMIZE = os.getenv("LOGO_OPTIMIZE", "1") != "0"
+LOGO_WEBP_QUALITY = int(os.getenv("LOGO_WEBP_QUALITY", 60))
+
+_published = {}  # source path -> URL of the best published variant
+_lock = threading.Lock()
+
+
+def app_static_dir():
+    """Folder Streamlit serves at /app/static/: static/ next to the main script"""
+    if os.getenv("APP_STATIC_DIR"):
+        return os.getenv("APP_STATIC_DIR")
+    # streamlit run replaces sys.argv with [main_script, *args]
+    main_script = sys.argv[0] if sys.argv and sys.argv[0].endswith(".py") else None
+    if main_script is None:
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(main_script)), "static")
+
+
+@lru_cache(maxsize=None)
+def file_digest(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:12]
+
+
+@lru_cache(maxsize=None)
+def data_uri(path):
+    """Base64 data URI of a file, encoded once per process"""
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as file:
+        return f"data:{mime};base64,{base64.b64encode(file.read()).decode()}"
+
+
+def _static_name(source, suffix):
+    # The content hash in the name lets browsers keep the file without revalidating it after changes
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return f"{stem}.{file_digest(source)}{suffix}"
+
+
+def _publish(target, write):
+    """Write target through write(tmp_path) and move it into place in one step
+
+    Readers never see a partial file, and a failed write leaves no temp file behind.
+    """
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _copy_to_static(source, static_dir):
+    name = _static_name(source, os.path.splitext(source)[1])
+    target = os.path.join(static_dir, name)
+    if not os.path.exists(target):
+        os.makedirs(static_dir, exist_ok=True)
+        _publish(target, lambda tmp_path: shutil.copyfile(source, tmp_path))
+    return f"/app/static/{name}"
+
+
+def _write_webp(source, static_dir, width):
+    """Resize an (animated) image to width at 2x density and save it as animated WebP"""
+    from PIL import Image, ImageSequence
+
+    name = _static_name(source, f".{width}.webp")
+    target = os.path.join(static_dir, name)
+    if not os.path.exists(target):
+        with Image.open(source) as image:
+            size = (width * 2, round(image.height * width * 2 / image.width))
+            if size[0] >= image.width:
+                size = image.size
+            frames = [frame.convert("RGBA").resize(size, Image.LANCZOS) for frame in ImageSequence.Iterator(image)]
+            durations = [frame.info.get("duration", 100) for frame in ImageSequence.Iterator(image)]
+        _publish(target, lambda tmp_path: frames[0].save(
+            tmp_path, "WEBP", save_all=True, append_images=frames[1:], duration=durations,
+            loop=0, quality=LOGO_WEBP_QUALITY, method=4))
+    return f"/app/static/{name}"
+
+
+def _optimize(source, static_dir, width):
+    try:
+        url = _write_webp(source, static_dir, width)
+        with _lock:
+            _published[source] = url
+    except Exception as e:
+        print(f"Logo optimization failed, serving original: {e}")
+
+
+def static_url(source, width=None):
+    """URL of source under Streamlit static serving, or None when static serving is unavailable
+
+    The original is published on first call; with width set, a resized WebP is
+    built in the background and served from then on.
+    """
+    with _lock:
+        url = _published.get(source)
+    if url is not None:
+        return url
+    static_dir = app_static_dir()
+    if static_dir is None or not st.get_option("server.enableStaticServing"):
+        return None
+    with _lock:
+        if source in _published:
+            return _published[source]
+        try:
+            url = _published[source] = _copy_to_static(source, static_dir)
+        except OSError as e:
+            print(f"Could not publish {source} to {static_dir}: {e}")
+            return None
+    if width and LOGO_OPTIMIZE:
+        threading.Thread(target=_optimize, args=(source, static_dir, width), name="logo-optimize",
+                         daemon=True).start()
+    return url
+
+
+def logo_html(width=LOGO_WIDTH):
+    """Sidebar logo markup referencing the static file, falling back to a cached data URI"""
+    src = static_url(LOGO_FILE, width) or data_uri(LOGO_FILE)
+    return f"""
+<div style="text-align: center;">
+    <img src="{src}" width="{width}">
+</div>
+"""
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from utils.metrics import registry
+
+CACHE_DIR = os.getenv("BHASHAAI_CACHE_DIR", ".cache")
+
+
+def make_key(*parts):
+    """Stable SHA-256 key over the given parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.sets = 0
+
+    def record(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+
+class LRUCache:
+    """In-memory LRU with a bounded entry count and optional TTL"""
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Persistent key/value tier shared by all worker processes through one SQLite file"""
+
+    def __init__(self, path, table="cache", ttl=None):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _connect(self):
+        # One connection per thread; WAL lets readers and a writer proceed concurrently
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """(value, expires_at) for an unexpired key, else None; expires_at is None for entries without a TTL"""
+        conn = self._connect()
+        row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            with conn:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            return None
+        return json.loads(value), expires_at
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at)
+            )
+
+    def items(self):
+        """Yield all unexpired (key, value) pairs, oldest first"""
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT key, value FROM {self.table} WHERE expires_at IS NULL OR expires_at >= ? ORDER BY rowid",
+            (time.time(),)
+        ).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+
+    def purge_expired(self):
+        conn = self._connect()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+
+
+class TieredCache:
+    """Memory LRU in front of an optional SQLite tier, with hit/miss counters
+
+    Values must be JSON-serializable when a disk tier is configured.
+    """
+
+    def __init__(self, name, maxsize=256, ttl=None, disk_path=None):
+        self.name = name
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = None
+        if disk_path:
+            try:
+                self.disk = SQLiteCache(disk_path, table=name, ttl=ttl)
+            except sqlite3.Error as e:
+                print(f"{name} cache: disk tier disabled ({e})")
+        self.stats = CacheStats()
+        registry.register_cache(name, self.stats)
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.record("memory_hits")
+            return value
+        if self.disk is not None:
+            try:
+                entry = self.disk.get_entry(key)
+            except sqlite3.Error as e:
+                print(f"{self.name} cache: disk read failed ({e})")
+                entry = None
+            if entry is not None and entry[0] is not None:
+                value, expires_at = entry
+                # Promote with whatever TTL the disk entry has left, not a fresh one
+                remaining = None if expires_at is None else expires_at - time.time()
+                if remaining is None or remaining > 0:
+                    self.memory.set(key, value, ttl=remaining)
+                self.stats.record("disk_hits")
+                return value
+        self.stats.record("misses")
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                print(f"{self.name} cache: disk write failed ({e})")
+        self.stats.record("sets")
@@ -0,0 +1,301 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from utils.cache import CACHE_DIR, TieredCache, make_key
+from utils.groq_api import DEFAULT_TEMPERATURE, GroqError, get_groq_client
+from utils.metrics import span
+from utils.normalize import normalize
+
+# Map-reduce tuning, overridable through the environment
+CHUNK_CHARS = int(os.getenv("EXPLAIN_CHUNK_CHARS", 3000))
+MAX_CHUNKS = int(os.getenv("EXPLAIN_MAX_CHUNKS", 12))  # Past this, chunks grow up to MAX_CHUNK_CHARS
+MAX_CHUNK_CHARS = int(os.getenv("EXPLAIN_MAX_CHUNK_CHARS", 12000))
+MAX_CONCURRENCY = int(os.getenv("EXPLAIN_MAX_CONCURRENCY", 4))
+# Estimated input tokens across all chunks (~120 pages); only text beyond it is skipped, and reported
+TOKEN_BUDGET = int(os.getenv("EXPLAIN_TOKEN_BUDGET", 120000))
+CHUNK_MAX_TOKENS = int(os.getenv("EXPLAIN_CHUNK_MAX_TOKENS", 600))
+REDUCE_MAX_TOKENS = int(os.getenv("EXPLAIN_REDUCE_MAX_TOKENS", 1000))
+# Partial explanations merged per reduce call; more are reduced in groups first
+REDUCE_INPUT_TOKENS = int(os.getenv("EXPLAIN_REDUCE_INPUT_TOKENS", 6000))
+
+# Explanation cache: bump PROMPT_VERSION whenever a prompt template changes
+PROMPT_VERSION = 1
+CACHE_MAX_ENTRIES = int(os.getenv("EXPLAIN_CACHE_MAX_ENTRIES", 512))
+CACHE_TTL_SECONDS = int(os.getenv("EXPLAIN_CACHE_TTL", 7 * 24 * 3600))
+CACHE_PATH = os.getenv("EXPLAIN_CACHE_PATH", os.path.join(CACHE_DIR, "explanations.sqlite3"))
+
+# Rough characters-per-token ratio; Indic scripts tokenize denser than English
+CHARS_PER_TOKEN = 3
+
+# Page separators: form feeds from pdfplumber and the OCR page headers
+PAGE_SPLIT_RE = re.compile(r"\f|\n?--- Page \d+ ---\n")
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?।])\s+")
+
+SINGLE_PROMPT = """
+तुम एक सहायक हो जो भारत के नागरिकों की सहायता करता है। कृपया नीचे दी गई सामग्री को {lang_prompt} में समझाओ ताकि सभी लोग उसे आसानी से समझ सकें।
+
+सामग्री:
+{text}
+"""
+
+CHUNK_PROMPT = """
+तुम एक सहायक हो जो भारत के नागरिकों की सहायता करता है। नीचे एक लंबे दस्तावेज़ का भाग {index}/{total} दिया गया है। कृपया इस भाग के मुख्य बिंदुओं को {lang_prompt} में संक्षेप में समझाओ।
+
+सामग्री:
+{text}
+"""
+
+REDUCE_PROMPT = """
+तुम एक सहायक हो जो भारत के नागरिकों की सहायता करता है। नीचे एक ही दस्तावेज़ के अलग-अलग भागों की व्याख्याएँ क्रम से दी गई हैं। कृपया इन्हें जोड़कर पूरे दस्तावेज़ की एक सुसंगत व्याख्या {lang_prompt} में लिखो, दोहराव हटाओ ताकि सभी लोग उसे आसानी से समझ सकें।
+
+व्याख्याएँ:
+{text}
+"""
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_oversized(piece, chunk_chars):
+    """Break a paragraph longer than chunk_chars on sentences, then hard-wrap"""
+    parts = []
+    for sentence in SENTENCE_SPLIT_RE.split(piece):
+        while len(sentence) > chunk_chars:
+            parts.append(sentence[:chunk_chars])
+            sentence = sentence[chunk_chars:]
+        if sentence:
+            parts.append(sentence)
+    return parts
+
+
+def split_text(text, chunk_chars=CHUNK_CHARS):
+    """Split text into chunks of at most chunk_chars on page and paragraph boundaries"""
+    chunks = []
+    current = ""
+    for page in PAGE_SPLIT_RE.split(text):
+        for paragraph in PARAGRAPH_SPLIT_RE.split(page):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            pieces = [paragraph] if len(paragraph) <= chunk_chars else _split_oversized(paragraph, chunk_chars)
+            for piece in pieces:
+                if current and len(current) + 2 + len(piece) > chunk_chars:
+                    chunks.append(current)
+                    current = ""
+                current = f"{current}\n\n{piece}" if current else piece
+        # Prefer to start a new chunk on a page boundary once the current one is half full
+        if current and len(current) >= chunk_chars // 2:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def select_chunks(chunks, token_budget=TOKEN_BUDGET):
+    """Keep leading chunks within the input token budget; returns (selected, skipped chars)"""
+    selected = []
+    used = 0
+    for index, chunk in enumerate(chunks):
+        cost = estimate_tokens(chunk)
+        if selected and used + cost > token_budget:
+            return selected, sum(len(rest) for rest in chunks[index:])
+        selected.append(chunk)
+        used += cost
+    return selected, 0
+
+
+# The UI, the API and the explain span all ask for the plan of the text being
+# explained, so the last few plans are kept rather than re-chunked per caller
+@lru_cache(maxsize=8)
+def plan_chunks(text, chunk_chars=CHUNK_CHARS, max_chunks=MAX_CHUNKS, max_chunk_chars=MAX_CHUNK_CHARS,
+                token_budget=TOKEN_BUDGET):
+    """Chunks to explain (a tuple) and the number of trailing characters left out
+
+    Long documents get proportionally larger chunks (up to max_chunk_chars) so
+    they stay near max_chunks map calls; past that the chunk count grows, and
+    only text beyond token_budget is skipped.
+    """
+    text = normalize(text, "llm")
+    chunks = split_text(text, chunk_chars)
+    if len(chunks) > max_chunks and chunk_chars < max_chunk_chars:
+        # Page-boundary splitting leaves chunks short of the target, hence the headroom
+        scaled = min(max_chunk_chars, max(chunk_chars, len(text) * 5 // (max_chunks * 4)))
+        chunks = split_text(text, scaled)
+    selected, skipped = select_chunks(chunks, token_budget)
+    return tuple(selected), skipped
+
+
+def skipped_chars(text):
+    """Characters at the end of text that exceed the token budget and are not explained"""
+    return plan_chunks(text)[1]
+
+
+def _complete_all(prompts, language, complete, max_tokens, max_concurrency):
+    """complete() every prompt concurrently; failed prompts come back as their GroqError"""
+    def run(prompt):
+        try:
+            return complete(prompt, language, max_tokens=max_tokens)
+        except GroqError as e:
+            return e
+
+    # Bounded fan-out: latency follows the slowest call, not the sum of calls
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts)))) as pool:
+        return list(pool.map(run, prompts))
+
+
+def _all_completed(results, what):
+    """The completions, in order; raises GroqError naming the parts that failed
+
+    A partial result would read as a complete explanation with sections of the
+    document missing, so one failed part fails the whole explanation.
+    """
+    failed = [index for index, r in enumerate(results, start=1) if not isinstance(r, str) or not r.strip()]
+    if not failed:
+        return results
+    error = next((r for r in results if isinstance(r, GroqError)), None)
+    parts = ", ".join(map(str, failed))
+    raise GroqError(f"Could not explain {what} {parts} of {len(results)}: "
+                    f"{error or 'empty response'}") from error
+
+
+def _reduce_prompt(partials, lang_prompt):
+    merged = "\n\n".join(f"[{i}] {p.strip()}" for i, p in enumerate(partials, start=1))
+    return REDUCE_PROMPT.format(lang_prompt=lang_prompt, text=merged)
+
+
+def _group_partials(partials, token_budget):
+    """Consecutive runs of partials whose merged size fits token_budget, at least two per run"""
+    groups = [[]]
+    used = 0
+    for partial in partials:
+        cost = estimate_tokens(partial)
+        if len(groups[-1]) >= 2 and used + cost > token_budget:
+            groups.append([])
+            used = 0
+        groups[-1].append(partial)
+        used += cost
+    if len(groups) > 1 and len(groups[-1]) == 1:
+        groups[-2].extend(groups.pop())
+    return groups
+
+
+def map_chunks(chunks, language, lang_prompt, complete, max_concurrency=MAX_CONCURRENCY,
+               reduce_input_tokens=REDUCE_INPUT_TOKENS):
+    """Explain chunks concurrently and return the final reduce prompt, or the lone partial explanation
+
+    When the partials do not fit one reduce prompt, consecutive groups of them
+    are reduced first, level by level, so no part of the document is dropped.
+    Raises GroqError if any chunk or group fails.
+    """
+    total = len(chunks)
+    prompts = [CHUNK_PROMPT.format(index=index, total=total, lang_prompt=lang_prompt, text=chunk)
+               for index, chunk in enumerate(chunks, start=1)]
+    partials = _all_completed(_complete_all(prompts, language, complete, CHUNK_MAX_TOKENS, max_concurrency),
+                              "document parts")
+
+    while len(partials) > 2 and sum(estimate_tokens(p) for p in partials) > reduce_input_tokens:
+        groups = _group_partials(partials, reduce_input_tokens)
+        if len(groups) == 1:
+            break
+        prompts = [_reduce_prompt(group, lang_prompt) for group in groups]
+        partials = _all_completed(
+            _complete_all(prompts, language, complete, REDUCE_MAX_TOKENS, max_concurrency), "summary groups")
+
+    if len(partials) == 1:
+        return None, partials[0]
+    return _reduce_prompt(partials, lang_prompt), None
+
+
+def explain_document(text, language, lang_prompt, complete=None, max_concurrency=MAX_CONCURRENCY):
+    """Explain text of any length, map-reducing over chunks when it does not fit one prompt
+
+    complete(prompt, language, max_tokens=...) defaults to the shared Groq client and
+    must raise GroqError on failure.
+    """
+    if complete is None:
+        complete = get_groq_client().complete
+
+    chunks, _ = plan_chunks(text)
+    if not chunks:
+        return None
+    if len(chunks) == 1:
+        return complete(SINGLE_PROMPT.format(lang_prompt=lang_prompt, text=chunks[0]), language)
+
+    reduce_prompt, partial = map_chunks(chunks, language, lang_prompt, complete, max_concurrency)
+    if partial is not None:
+        return partial
+    return complete(reduce_prompt, language, max_tokens=REDUCE_MAX_TOKENS)
+
+
+def explain_document_stream(text, language, lang_prompt, client=None, max_concurrency=MAX_CONCURRENCY):
+    """Like explain_document, but yield the final (single or reduce) completion token by token"""
+    if client is None:
+        client = get_groq_client()
+
+    chunks, _ = plan_chunks(text)
+    if not chunks:
+        return
+    if len(chunks) == 1:
+        yield from client.stream(SINGLE_PROMPT.format(lang_prompt=lang_prompt, text=chunks[0]), language)
+        return
+
+    reduce_prompt, partial = map_chunks(chunks, language, lang_prompt, client.complete, max_concurrency)
+    if partial is not None:
+        yield partial
+        return
+    yield from client.stream(reduce_prompt, language, max_tokens=REDUCE_MAX_TOKENS)
+
+
+explanation_cache = TieredCache("explanations", maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS,
+                                disk_path=CACHE_PATH)
+
+
+def explanation_key(text, language, model):
+    # Trivially different inputs (whitespace, NFC, invisible characters) share a key
+    return make_key(normalize(text, "key"), language, model, DEFAULT_TEMPERATURE, PROMPT_VERSION,
+                    CHUNK_CHARS, MAX_CHUNKS, MAX_CHUNK_CHARS, TOKEN_BUDGET, REDUCE_INPUT_TOKENS)
+
+
+def explain_document_cached(text, language, lang_prompt):
+    """explain_document behind the content-addressed explanation cache"""
+    client = get_groq_client()
+    key = explanation_key(text, language, client.model)
+    with span("explain", language=language, chars=len(text), cached=False,
+              skipped_chars=skipped_chars(text)) as fields:
+        output = explanation_cache.get(key)
+        if output is not None:
+            fields["cached"] = True
+            return output
+        output = explain_document(text, language, lang_prompt, complete=client.complete)
+        fields["output_chars"] = len(output or "")
+    # Reached only when every chunk and reduce call succeeded; a failed part raises before this
+    if output:
+        explanation_cache.set(key, output)
+    return output
+
+
+def explain_document_stream_cached(text, language, lang_prompt):
+    """explain_document_stream behind the explanation cache; a hit is yielded in one piece"""
+    client = get_groq_client()
+    key = explanation_key(text, language, client.model)
+    with span("explain", language=language, chars=len(text), cached=False, stream=True,
+              skipped_chars=skipped_chars(text)) as fields:
+        output = explanation_cache.get(key)
+        if output is not None:
+            fields["cached"] = True
+            yield output
+            return
+        parts = []
+        for token in explain_document_stream(text, language, lang_prompt, client=client):
+            parts.append(token)
+            yield token
+        output = "".join(parts)
+        fields["output_chars"] = len(output)
+    # As above: only a stream that ran to [DONE] after a fully successful map phase is cached
+    if output:
+        explanation_cache.set(key, output)
@@ -0,0 +1,107 @@
+import os
+import threading
+
+# Bundled fonts, found relative to the repo so the batch CLI works from any directory
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+# Extra directories searched for fonts not bundled in assets/, e.g. the
+# fonts-noto-core package on Debian/Ubuntu; BHASHAAI_FONT_DIRS is os.pathsep separated
+FONT_DIRS = [FONT_DIR] + [d for d in os.getenv("BHASHAAI_FONT_DIRS", "").split(os.pathsep) if d] + [
+    "/usr/share/fonts/truetype/noto",
+    "/usr/share/fonts/opentype/noto",
+    "/usr/share/fonts/noto"
+]
+DEVANAGARI_FONT = ("Noto", "NotoSerifDevanagari-Regular.ttf")
+
+# ReportLab font name and Noto Serif file per script, all bundled in assets/ (see assets/OFL.txt).
+# Arabic (Urdu) is left out: ReportLab draws it left to right without bidi reordering
+# or joining forms, which is unreadable, so Urdu gets no PDF until that is handled.
+SCRIPT_FONTS = {
+    "Devanagari": DEVANAGARI_FONT,
+    "Bengali": ("NotoBengali", "NotoSerifBengali-Regular.ttf"),
+    "Tamil": ("NotoTamil", "NotoSerifTamil-Regular.ttf"),
+    "Telugu": ("NotoTelugu", "NotoSerifTelugu-Regular.ttf"),
+    "Gujarati": ("NotoGujarati", "NotoSerifGujarati-Regular.ttf"),
+    "Malayalam": ("NotoMalayalam", "NotoSerifMalayalam-Regular.ttf"),
+    "Kannada": ("NotoKannada", "NotoSerifKannada-Regular.ttf"),
+    "Oriya": ("NotoOriya", "NotoSerifOriya-Regular.ttf")
+}
+
+# Scripts whose pre-base vowel signs and conjuncts need OpenType shaping (uharfbuzz)
+# to be readable. Devanagari PDFs were always drawn unshaped, so they stay available.
+SHAPED_SCRIPTS = {"Bengali", "Tamil", "Telugu", "Gujarati", "Malayalam", "Kannada", "Oriya"}
+
+LANGUAGE_SCRIPTS = {
+    "Hindi": "Devanagari",
+    "Marathi": "Devanagari",
+    "Bengali": "Bengali",
+    "Telugu": "Telugu",
+    "Tamil": "Tamil",
+    "Urdu": "Arabic",
+    "Gujarati": "Gujarati",
+    "Malayalam": "Malayalam",
+    "Kannada": "Kannada",
+    "Odia": "Oriya"
+}
+
+_registered = set()
+_lock = threading.Lock()
+
+
+def find_font_file(filename, font_dirs=None):
+    """Return the first existing path of filename in the font directories, or None"""
+    for font_dir in font_dirs or FONT_DIRS:
+        font_path = os.path.join(font_dir, filename)
+        if os.path.exists(font_path):
+            return font_path
+    return None
+
+
+def register_font(name, filename, font_dir=None):
+    """Register a TTF with ReportLab once per process; later calls are free
+
+    ReportLab embeds registered TTFs as subsets containing only the glyphs a
+    document uses, so unused scripts and glyphs add nothing to the PDF.
+    """
+    if name in _registered:
+        return name
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    with _lock:
+        if name not in _registered:
+            font_path = find_font_file(filename, [font_dir] if font_dir else None)
+            if font_path is None:
+                raise FileNotFoundError(f"Font file missing: {filename}")
+            pdfmetrics.registerFont(TTFont(name, font_path))
+            _registered.add(name)
+    return name
+
+
+def register_devanagari_font():
+    return register_font(*DEVANAGARI_FONT)
+
+
+def shaping_available():
+    try:
+        import uharfbuzz  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _script_supported(script):
+    return script in SCRIPT_FONTS and (script not in SHAPED_SCRIPTS or shaping_available())
+
+
+def font_for_language(language):
+    """Register (on first use) and return the ReportLab font name for a language's script"""
+    script = LANGUAGE_SCRIPTS.get(language, "Devanagari")
+    if not _script_supported(script):
+        raise ValueError(f"PDF output does not support the {script} script ({language})")
+    return register_font(*SCRIPT_FONTS[script])
+
+
+def has_font(language):
+    """Whether PDFs can be rendered for a language: its script is supported and the font installed"""
+    script = LANGUAGE_SCRIPTS.get(language, "Devanagari")
+    return _script_supported(script) and find_font_file(SCRIPT_FONTS[script][1]) is not None
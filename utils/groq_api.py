@@ -1,45 +1,230 @@
+import json
 import os
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
 import requests
-import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import registry, span
 
 # Load from .env if present (for local use)
 load_dotenv()
 
-# First priority: .env, fallback to Streamlit/Render secrets
-GROQ_API_KEY = os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY", None)
+# Point at any OpenAI-compatible endpoint, e.g. the benchmark mock (benchmarks/mock_groq.py)
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+DEFAULT_TEMPERATURE = 0.7
 
-if not GROQ_API_KEY:
-    raise ValueError("🚨 GROQ_API_KEY not found! Please set it in .env or Render secrets.")
+# Network tuning, overridable through the environment
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("GROQ_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT_SECONDS = float(os.getenv("GROQ_READ_TIMEOUT", 60))
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", 3))
+BACKOFF_BASE_SECONDS = float(os.getenv("GROQ_BACKOFF_BASE", 0.5))
+BACKOFF_MAX_SECONDS = float(os.getenv("GROQ_BACKOFF_MAX", 20))
+POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", 10))
 
-def query_groq(prompt, language="Hindi"):
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": f"You are a helpful assistant who explains content in {language}."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 1000
-    }
-
-    response = requests.post(url, headers=headers, json=data)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GroqError(Exception):
+    """Raised when the Groq API cannot produce a completion"""
+
+
+def parse_retry_after(value):
+    """Return the Retry-After header as seconds, or None if absent/invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def record_usage(fields, usage):
+    """Copy token counts from a response's usage into span fields and the token counters"""
+    for kind in ("prompt", "completion"):
+        tokens = (usage or {}).get(f"{kind}_tokens")
+        if tokens:
+            fields[f"{kind}_tokens"] = tokens
+            registry.inc("bhashaai_groq_tokens_total", tokens, kind=kind)
+
+
+class GroqClient:
+    """Reusable Groq chat client with pooled keep-alive connections and retries"""
+
+    def __init__(self, api_key, url=GROQ_API_URL, model=DEFAULT_MODEL,
+                 connect_timeout=CONNECT_TIMEOUT_SECONDS, read_timeout=READ_TIMEOUT_SECONDS,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE_SECONDS,
+                 backoff_max=BACKOFF_MAX_SECONDS, pool_size=POOL_SIZE):
+        self.url = url
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # One session per client: TCP+TLS connections are kept alive and reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
 
+    def post(self, payload, stream=False):
+        """POST a payload, retrying on 5xx, 429 and transport errors"""
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout, stream=stream)
+            # Any transport failure (dropped connection, bad chunked body, redirect loop) is retried
+            except requests.RequestException as e:
+                if attempt >= self.max_retries:
+                    raise GroqError(f"Could not reach Groq API: {e}") from e
+                time.sleep(self.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                response.close()
+                time.sleep(self.backoff_delay(attempt, retry_after))
+                attempt += 1
+                continue
+
+            return response
+
+    def build_payload(self, prompt, language="Hindi", temperature=DEFAULT_TEMPERATURE, max_tokens=1000):
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": f"You are a helpful assistant who explains content in {language}."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+    def complete(self, prompt, language="Hindi", temperature=DEFAULT_TEMPERATURE, max_tokens=1000):
+        """Return the completion text for a prompt, raising GroqError on failure"""
+        with span("groq", model=self.model, stream=False) as fields:
+            response = self.post(self.build_payload(prompt, language, temperature, max_tokens))
+            fields["status_code"] = response.status_code
+            try:
+                res_json = response.json()
+            except ValueError as e:
+                raise GroqError(f"Failed to parse Groq API response: {response.text[:500]}") from e
+
+            if "choices" in res_json:
+                record_usage(fields, res_json.get("usage"))
+                return res_json["choices"][0]["message"]["content"]
+            if "error" in res_json:
+                raise GroqError(f"Groq API Error: {res_json['error'].get('message', 'Unknown error')}")
+            raise GroqError("Invalid response format from Groq API.")
+
+    def stream(self, prompt, language="Hindi", temperature=DEFAULT_TEMPERATURE, max_tokens=1000):
+        """Yield completion text deltas as they arrive over the SSE stream"""
+        payload = self.build_payload(prompt, language, temperature, max_tokens)
+        payload["stream"] = True
+        started = time.perf_counter()
+        with span("groq", model=self.model, stream=True) as fields, self.post(payload, stream=True) as response:
+            fields["status_code"] = response.status_code
+            if response.status_code != 200:
+                try:
+                    message = response.json().get("error", {}).get("message", "Unknown error")
+                except ValueError:
+                    message = response.text[:500]
+                raise GroqError(f"Groq API Error: {message}")
+
+            # SSE is always UTF-8; without a charset requests would assume ISO-8859-1
+            response.encoding = "utf-8"
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+                    try:
+                        event = json.loads(data)
+                    except ValueError:
+                        continue
+                    if "error" in event:
+                        raise GroqError(f"Groq API Error: {event['error'].get('message', 'Unknown error')}")
+                    # Groq reports usage on the last chunk, under x_groq
+                    record_usage(fields, event.get("usage") or (event.get("x_groq") or {}).get("usage"))
+                    choices = event.get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        if "first_token_seconds" not in fields:
+                            fields["first_token_seconds"] = round(time.perf_counter() - started, 6)
+                            registry.observe("bhashaai_groq_time_to_first_token_seconds",
+                                             fields["first_token_seconds"])
+                        yield delta
+            except requests.RequestException as e:
+                raise GroqError(f"Groq stream interrupted: {e}") from e
+            # A stream closed before [DONE] carries a truncated completion
+            raise GroqError("Groq stream ended before the completion was finished")
+
+    def close(self):
+        self.session.close()
+
+
+def get_api_key():
+    """GROQ_API_KEY from the environment or .env, falling back to Streamlit secrets inside the UI"""
+    api_key = os.getenv("GROQ_API_KEY")
+    if api_key:
+        return api_key
+    # Only consult st.secrets when running under Streamlit; the core never imports it
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try:
+            return st.secrets.get("GROQ_API_KEY", None)
+        except Exception:
+            return None
+    return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    """Return the process-wide Groq client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = get_api_key()
+                if not api_key:
+                    raise GroqError("🚨 GROQ_API_KEY not found! Please set it in .env or Render secrets.")
+                _client = GroqClient(api_key)
+    return _client
+
+
+def query_groq(prompt, language="Hindi"):
+    """Single completion for prompt, or None on failure (the error is logged)"""
     try:
-        res_json = response.json()
-        if "choices" in res_json:
-            return res_json["choices"][0]["message"]["content"]
-        elif "error" in res_json:
-            st.error(f"Groq API Error: {res_json['error'].get('message', 'Unknown error')}")
-        else:
-            st.error("Invalid response format from Groq API.")
+        return get_groq_client().complete(prompt, language)
+    except GroqError as e:
+        print(f"❌ {e}")
         return None
-    except Exception as e:
-        st.error("❌ Failed to parse Groq API response.")
-        st.text(response.text)
-        return None
\ No newline at end of file
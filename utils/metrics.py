@@ -0,0 +1,259 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Span log: "-" writes one JSON object per line to stderr (Render collects it, and
+# stdout stays clean for CLI output), a path appends to that file, "" turns span
+# logging off. Metrics are kept either way.
+METRICS_LOG = os.getenv("BHASHAAI_METRICS_LOG", "-")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # Standalone /metrics server, e.g. next to Streamlit
+
+# Seconds; OCR pages and Groq calls land in the 0.5-30s range, cache hits well below
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+STAGE_SECONDS = "bhashaai_stage_duration_seconds"
+STAGE_ERRORS = "bhashaai_stage_errors_total"
+STAGE_IN_FLIGHT = "bhashaai_stage_in_flight"
+
+HELP = {
+    STAGE_SECONDS: "Time spent in each pipeline stage",
+    STAGE_ERRORS: "Pipeline stage runs that raised",
+    STAGE_IN_FLIGHT: "Pipeline stage runs currently in progress",
+    "bhashaai_groq_tokens_total": "Groq tokens from response usage, by kind",
+    "bhashaai_groq_time_to_first_token_seconds": "Time from request to the first streamed token",
+    "bhashaai_tts_chunks_total": "Audio chunks synthesized, by backend",
+    "bhashaai_cache_lookups_total": "Cache lookups by result",
+    "bhashaai_cache_hit_ratio": "Share of cache lookups served from memory or disk",
+    "bhashaai_rerun_memo_total": "Streamlit reruns that reused (hit) or recomputed (miss) a stage result",
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and histograms, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.caches = {}
+        self.collectors = []
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def add(self, name, delta, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def register_cache(self, name, stats):
+        """Export a CacheStats-like object (as_dict() with *_hits, misses, hit_rate) as name"""
+        with self._lock:
+            self.caches[name] = stats
+
+    def register_collector(self, collect):
+        """collect() returns (name, type, labels dict, value) samples, read at render time"""
+        with self._lock:
+            self.collectors.append(collect)
+
+    def _samples(self):
+        """Every sample as {name: (type, [(labels, suffix, value)])}"""
+        families = {}
+
+        def add(name, kind, labels, value, suffix=""):
+            families.setdefault(name, (kind, []))[1].append((labels, suffix, value))
+
+        with self._lock:
+            for (name, labels), value in self.counters.items():
+                add(name, "counter", labels, value)
+            for (name, labels), value in self.gauges.items():
+                add(name, "gauge", labels, value)
+            for (name, labels), histogram in self.histograms.items():
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    add(name, "histogram", labels + (("le", _format_value(float(bound))),), count, "_bucket")
+                add(name, "histogram", labels + (("le", "+Inf"),), histogram.count, "_bucket")
+                add(name, "histogram", labels, round(histogram.sum, 6), "_sum")
+                add(name, "histogram", labels, histogram.count, "_count")
+            caches = list(self.caches.items())
+            collectors = list(self.collectors)
+
+        for cache, stats in caches:
+            values = stats.as_dict()
+            for field, result in (("memory_hits", "memory_hit"), ("disk_hits", "disk_hit"), ("misses", "miss")):
+                add("bhashaai_cache_lookups_total", "counter",
+                    _label_key({"cache": cache, "result": result}), values[field])
+            add("bhashaai_cache_hit_ratio", "gauge", _label_key({"cache": cache}), round(values["hit_rate"], 4))
+        for collect in collectors:
+            try:
+                for name, kind, labels, value in collect():
+                    add(name, kind, _label_key(labels), value)
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        return families
+
+    def render(self):
+        lines = []
+        for name, (kind, samples) in sorted(self._samples().items()):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, suffix, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+_log_lock = threading.Lock()
+_log_file = None
+
+
+def log_event(event):
+    """Write one JSON object to the span log"""
+    global _log_file
+    if not METRICS_LOG:
+        return
+    line = json.dumps(event, ensure_ascii=False, default=str)
+    with _log_lock:
+        if METRICS_LOG == "-":
+            sys.stderr.write(line + "\n")
+            sys.stderr.flush()
+            return
+        try:
+            if _log_file is None:
+                _log_file = open(METRICS_LOG, "a", encoding="utf-8")
+            _log_file.write(line + "\n")
+            _log_file.flush()
+        except OSError as e:
+            print(f"Could not write metrics log: {e}")
+
+
+def set_metrics_log(target):
+    """Redirect the span log ("-", a path or ""), in this process and in processes it spawns later"""
+    global METRICS_LOG, _log_file
+    os.environ["BHASHAAI_METRICS_LOG"] = target
+    with _log_lock:
+        if _log_file is not None:
+            _log_file.close()
+            _log_file = None
+        METRICS_LOG = target
+
+
+def record(stage, seconds, status="ok", **fields):
+    """Record a stage run that was timed elsewhere, e.g. an OCR page timed inside a worker process"""
+    registry.observe(STAGE_SECONDS, seconds, stage=stage)
+    if status != "ok":
+        registry.inc(STAGE_ERRORS, stage=stage)
+    log_event({"ts": datetime.now(timezone.utc).isoformat(), "stage": stage, "seconds": round(seconds, 6),
+               "status": status, **fields})
+
+
+@contextmanager
+def span(stage, **fields):
+    """Time a pipeline stage into the stage histogram and the span log
+
+    Yields the span's fields dict, so results known only at the end (token
+    counts, page counts) can be added to it. An exception marks the span as
+    failed and propagates; a generator closed early (GeneratorExit) is "cancelled".
+    """
+    registry.add(STAGE_IN_FLIGHT, 1, stage=stage)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield fields
+    except GeneratorExit:
+        status = "cancelled"
+        raise
+    except BaseException as e:
+        status = "error"
+        fields["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        registry.add(STAGE_IN_FLIGHT, -1, stage=stage)
+        record(stage, time.perf_counter() - started, status, **fields)
+
+
+def metrics_text():
+    return registry.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """Serve /metrics on port in a daemon thread; no-op when port is 0 or it is already running"""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+            print(f"Metrics served on :{port}/metrics")
+    return _server
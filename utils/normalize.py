@@ -0,0 +1,121 @@
+import re
+import unicodedata
+
+# One C-speed pass per concern that is actually present: literal-led regexes for
+# mojibake, unicodedata for NFC, str.replace for each invisible character found,
+# and str.split for whitespace. Control characters are rare, so they are only
+# looked for in the text's Latin-1 slice (every one of them lives there), and a
+# regex runs only when some are found. (str.translate falls back to a
+# per-character dict lookup on non-Latin-1 text, and one character-class regex
+# over everything scans several times slower than these on Indic text.)
+
+# UTF-8 text decoded as cp1252 (common in pasted text and some PDF text layers)
+MOJIBAKE = {
+    "â€™": "'", "â€˜": "'", "â€œ": '"', "â€": '"',
+    "Ã¡": "á", "Ã©": "é", "Ã­": "í", "Ã³": "ó", "Ãº": "ú"
+}
+
+
+def _mojibake_subs():
+    """One (lead character, regex, replacement) per replacement, in longest-sequence order
+
+    The order makes "â€" catch only what the specific sequences left. A literal lead
+    lets the regex engine skip ahead, and a string replacement avoids a call per match.
+    """
+    groups = {}
+    for bad, good in sorted(MOJIBAKE.items(), key=lambda item: len(item[0]), reverse=True):
+        groups.setdefault(good, []).append(bad)
+    return [(bads[0][0], re.compile("|".join(map(re.escape, bads))), good) for good, bads in groups.items()]
+
+
+MOJIBAKE_SUBS = _mojibake_subs()
+
+# Invisible characters that only get in the way of prompts, layout and speech
+INVISIBLE = "\ufeff\u200b\u2060\u00ad"  # BOM, zero-width space, word joiner, soft hyphen
+# Joiners change the rendering of some Indic conjuncts but break the PDF fonts and TTS
+JOINERS = "\u200c\u200d"  # ZWNJ, ZWJ
+# C0/C1 controls except tab, newline and form feed (the page separator)
+CONTROLS = "".join(chr(c) for c in [*range(0x00, 0x09), 0x0b, *range(0x0e, 0x20), *range(0x7f, 0xa0)])
+CONTROL_BYTES = CONTROLS.encode("latin-1")
+CONTROLS_RE = re.compile(f"[{re.escape(CONTROLS)}]+")
+# Markdown syntax from LLM output that TTS engines would read out
+MARKDOWN = "*#`_~|>"
+
+NEWLINE_RE = re.compile(r"\r\n?")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Characters outside the fonts of the FPDF fallbacks become spaces
+CHARSETS = {
+    "latin_devanagari": re.compile(r"[^\x20-\x7e\xa0-\xff\u0900-\u097f\n\t]+"),
+    "ascii": re.compile(r"[^\x20-\x7e\n\t]+")
+}
+DEVANAGARI_RE = re.compile(r"[\u0900-\u097f]+")
+
+# Sentence ends for Latin, Devanagari (danda, double danda) and Urdu scripts
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?\u0964\u0965\u06d4\u061f])\s+")
+
+PROFILES = {
+    # Text sent to the LLM: keep paragraphs and page breaks, keep joiners
+    "llm": {"strip_joiners": False, "markdown": False, "charset": None, "whitespace": "lines"},
+    # Explanation text shown or stored as one block
+    "display": {"strip_joiners": True, "markdown": False, "charset": None, "whitespace": "all"},
+    # ReportLab PDF: paragraphs are laid out separately
+    "pdf": {"strip_joiners": True, "markdown": False, "charset": None, "whitespace": "lines"},
+    # FPDF fallback with the Devanagari font
+    "pdf_safe": {"strip_joiners": True, "markdown": False, "charset": "latin_devanagari", "whitespace": "all"},
+    # Last-resort ASCII PDF; Devanagari words become "?"
+    "ascii": {"strip_joiners": True, "markdown": False, "charset": "ascii", "whitespace": "all"},
+    # Speech: one flowing text without markdown symbols
+    "tts": {"strip_joiners": True, "markdown": True, "charset": None, "whitespace": "all"},
+    # Cache keys: what the LLM would see, whatever the whitespace
+    "key": {"strip_joiners": False, "markdown": False, "charset": None, "whitespace": "all"}
+}
+
+
+def _has_controls(text):
+    latin1 = text.encode("latin-1", "ignore")
+    return len(latin1.translate(None, CONTROL_BYTES)) != len(latin1)
+
+
+def _collapse_lines(text):
+    # str.split() also splits on form feeds, so page separators are handled first
+    return "\n".join("\f".join(" ".join(part.split()) for part in line.split("\f"))
+                     for line in text.split("\n"))
+
+
+def normalize(text, profile="display", **overrides):
+    """Clean text for one output path: mojibake, NFC, invisibles, charset, whitespace
+
+    Keyword overrides replace individual profile settings.
+    """
+    if not text:
+        return ""
+    settings = dict(PROFILES[profile], **overrides)
+    for lead, pattern, good in MOJIBAKE_SUBS:
+        if lead in text:
+            text = pattern.sub(good, text)
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    # str.split below already treats "\r" as whitespace
+    if settings["whitespace"] != "all" and "\r" in text:
+        text = NEWLINE_RE.sub("\n", text)
+    deleted = INVISIBLE + (JOINERS if settings["strip_joiners"] else "") + (MARKDOWN if settings["markdown"] else "")
+    for char in deleted:
+        if char in text:
+            text = text.replace(char, "")
+    if _has_controls(text):
+        text = CONTROLS_RE.sub("", text)
+
+    charset = settings["charset"]
+    if charset == "ascii":
+        text = DEVANAGARI_RE.sub("?", text)
+    if charset:
+        text = CHARSETS[charset].sub(" ", text)
+
+    if settings["whitespace"] == "all":
+        return " ".join(text.split())
+    return BLANK_LINES_RE.sub("\n\n", _collapse_lines(text)).strip()
+
+
+def split_sentences(text):
+    return [sentence for sentence in SENTENCE_SPLIT_RE.split(text) if sentence.strip()]
@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.metrics import STAGE_ERRORS, record, registry
+from utils.preprocess import preprocess_image
+
+# Languages loaded into every easyocr.Reader
+OCR_LANGUAGES = ["en", "hi"]
+
+
+def available_cpus():
+    """CPUs this process may run on; os.cpu_count() reports the host's inside a container"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS / Windows
+        return os.cpu_count() or 1
+
+
+# Page-parallel OCR tuning, overridable through the environment
+# OCR_EXECUTION_MODE: "serial" (one shared reader, torch parallelizes each page),
+# "thread" (workers share that reader) or "process" (one reader per worker process)
+OCR_EXECUTION_MODE = os.getenv("OCR_EXECUTION_MODE", "serial").lower()
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", min(4, available_cpus())))
+# Torch intra-op threads per worker process; keep workers * threads <= cores to avoid oversubscription
+OCR_TORCH_THREADS = int(os.getenv("OCR_TORCH_THREADS", max(1, available_cpus() // max(1, OCR_WORKERS))))
+
+
+def create_reader():
+    """Load an easyocr reader (detection + recognition models)"""
+    import easyocr
+    return easyocr.Reader(OCR_LANGUAGES, gpu=False)
+
+
+_shared_reader = None
+_shared_reader_lock = threading.Lock()
+
+
+def get_shared_reader():
+    """Return the process-wide reader, loading it once; concurrent callers wait for the load"""
+    global _shared_reader
+    if _shared_reader is None:
+        with _shared_reader_lock:
+            if _shared_reader is None:
+                _shared_reader = create_reader()
+    return _shared_reader
+
+
+def set_torch_threads(num_threads):
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except Exception as e:
+        print(f"Could not set torch threads: {e}")
+
+
+def read_text(reader, image_array):
+    """OCR one image array and return its text as a single line"""
+    results = reader.readtext(image_array, detail=0)
+    return ' '.join(results).strip()
+
+
+def _init_worker_process(torch_threads):
+    # torch.set_num_threads is process-wide, so it is only ever set inside worker processes
+    set_torch_threads(torch_threads)
+    get_shared_reader()
+
+
+def _noop():
+    return None
+
+
+def _ocr_page(image_array, profile):
+    # Thread workers share the process's reader; a worker process has its own, loaded
+    # by _init_worker_process. Preprocessing runs here so it is parallelized along with
+    # OCR; the time is returned, since a worker process has its own metrics
+    started = time.perf_counter()
+    text = read_text(get_shared_reader(), preprocess_image(image_array, profile))
+    return text, time.perf_counter() - started
+
+
+class OCRPool:
+    """Runs OCR over many pages concurrently and returns text in page order"""
+
+    def __init__(self, mode=OCR_EXECUTION_MODE, workers=OCR_WORKERS, torch_threads=OCR_TORCH_THREADS):
+        self.mode = mode if workers > 1 else "serial"
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    # spawn: forking a multi-threaded server process is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker_process,
+                        initargs=(self.torch_threads,)
+                    )
+                else:
+                    # No per-thread readers: one copy of the model weights per process
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+            return self._executor
+
+    def warm(self):
+        """Load the readers now instead of on the first document (one per worker in process mode)"""
+        get_shared_reader()
+        if self.mode != "process":
+            return
+        executor = self._get_executor()
+        # Each submit while all workers are busy starts another worker (and its initializer)
+        futures = [executor.submit(_noop) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def ocr_pages(self, images, reader=None, progress=None, total=None, cache=None, profile="raster"):
+        """OCR an iterable of page image arrays
+
+        Returns one string per page, in input order. Pages are pulled from the
+        iterable lazily and at most two per worker are in flight, so a page
+        generator keeps memory bounded. Pages found in cache (an OCRCache) skip
+        OCR; the rest are preprocessed with the given profile. reader is used in serial mode; progress(done, total) is called
+        from the calling thread.
+        """
+        if self.mode == "serial":
+            return self._ocr_serial(images, reader, progress, total, cache, profile)
+
+        executor = self._get_executor()
+        max_in_flight = self.workers * 2
+        pending = {}
+        texts = {}
+        done_count = 0
+
+        def finish(index, text):
+            nonlocal done_count
+            texts[index] = text
+            done_count += 1
+            if progress:
+                progress(done_count, total or done_count + len(pending))
+
+        def collect(finished):
+            for future in finished:
+                index, keys = pending.pop(future)
+                try:
+                    text, seconds = future.result()
+                except BrokenProcessPool:
+                    self.shutdown()
+                    raise
+                except Exception as e:
+                    print(f"OCR failed on page {index + 1}: {e}")
+                    registry.inc(STAGE_ERRORS, stage="ocr_page")
+                    text = ""
+                else:
+                    record("ocr_page", seconds, page=index + 1, profile=profile, mode=self.mode, chars=len(text))
+                    if keys is not None:
+                        cache.set_page(keys, text)
+                finish(index, text)
+
+        for index, image_array in enumerate(images):
+            keys = cache.page_keys(image_array) if cache is not None else None
+            cached = cache.get_page(keys) if keys is not None else None
+            if cached is not None:
+                finish(index, cached)
+                continue
+            if len(pending) >= max_in_flight:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+            pending[executor.submit(_ocr_page, image_array, profile)] = (index, keys)
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+
+        return [texts[i] for i in range(len(texts))]
+
+    def _ocr_serial(self, images, reader, progress, total, cache, profile):
+        if reader is None:
+            reader = get_shared_reader()
+        texts = []
+        for index, image_array in enumerate(images):
+            keys = cache.page_keys(image_array) if cache is not None else None
+            text = cache.get_page(keys) if keys is not None else None
+            if text is None:
+                started = time.perf_counter()
+                try:
+                    text = read_text(reader, preprocess_image(image_array, profile))
+                    record("ocr_page", time.perf_counter() - started, page=index + 1, profile=profile,
+                           mode=self.mode, chars=len(text))
+                    if keys is not None:
+                        cache.set_page(keys, text)
+                except Exception as e:
+                    print(f"OCR failed on page {index + 1}: {e}")
+                    registry.inc(STAGE_ERRORS, stage="ocr_page")
+                    text = ""
+            texts.append(text)
+            if progress:
+                progress(index + 1, total or index + 1)
+        return texts
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_pool():
+    """Return the process-wide OCR pool; workers stay warm between documents"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = OCRPool()
+    return _pool
+
+
+def set_ocr_pool(pool):
+    """Use pool as the process-wide OCR pool, e.g. one with a different execution mode"""
+    global _pool
+    with _pool_lock:
+        previous, _pool = _pool, pool
+    if previous is not None and previous is not pool:
+        previous.shutdown()
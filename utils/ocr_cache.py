@@ -0,0 +1,159 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.cache import CACHE_DIR, CacheStats, SQLiteCache, TieredCache, make_key
+from utils.metrics import registry
+from utils.ocr import OCR_LANGUAGES
+
+# Bump when OCR languages, models or preprocessing change so stale text is not served
+OCR_CACHE_VERSION = 2
+
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", 1024))
+OCR_CACHE_TTL_SECONDS = int(os.getenv("OCR_CACHE_TTL", 30 * 24 * 3600))
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", os.path.join(CACHE_DIR, "ocr.sqlite3"))
+
+# Near-duplicate matching on a perceptual page hash. Disabled (-1) by default:
+# filled-in ID forms (Aadhaar, ration cards) share a template and would hash
+# alike, so only enable it for deployments that serve public notices.
+OCR_PHASH_MAX_DISTANCE = int(os.getenv("OCR_PHASH_MAX_DISTANCE", -1))
+PHASH_SIZE = 16  # 16x16 difference hash = 256 bits
+
+
+def perceptual_hash(image_array, size=PHASH_SIZE):
+    """Difference hash of an image array as an int; robust to re-scans and rescaling"""
+    import cv2
+    gray = image_array if image_array.ndim == 2 else image_array[..., :3].mean(axis=2)
+    small = cv2.resize(np.asarray(gray, dtype=np.float32), (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+class PerceptualIndex:
+    """Bounded nearest-neighbour lookup of OCR text by perceptual hash"""
+
+    def __init__(self, max_distance, maxsize=OCR_CACHE_MAX_ENTRIES, ttl=None, disk_path=None):
+        self.max_distance = max_distance
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+        registry.register_cache("ocr_phash", self.stats)
+        self.disk = None
+        if disk_path:
+            try:
+                self.disk = SQLiteCache(disk_path, table="ocr_phash", ttl=ttl)
+                for key, text in self.disk.items():
+                    self._remember(int(key, 16), text)
+            except sqlite3.Error as e:
+                print(f"ocr_phash cache: disk tier disabled ({e})")
+                self.disk = None
+
+    def _remember(self, phash, text):
+        with self._lock:
+            self._data[phash] = text
+            self._data.move_to_end(phash)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, phash):
+        with self._lock:
+            best, best_distance = None, self.max_distance + 1
+            for candidate in self._data:
+                distance = hamming_distance(phash, candidate)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+            if best is not None:
+                self._data.move_to_end(best)
+                self.stats.record("memory_hits")
+                return self._data[best]
+        self.stats.record("misses")
+        return None
+
+    def set(self, phash, text):
+        self._remember(phash, text)
+        if self.disk is not None:
+            try:
+                self.disk.set(format(phash, "x"), text)
+            except sqlite3.Error as e:
+                print(f"ocr_phash cache: disk write failed ({e})")
+        self.stats.record("sets")
+
+
+class OCRCache:
+    """OCR text cache: exact upload/page hashes first, then optional near-duplicate pages"""
+
+    def __init__(self, maxsize=OCR_CACHE_MAX_ENTRIES, ttl=OCR_CACHE_TTL_SECONDS, disk_path=OCR_CACHE_PATH,
+                 phash_max_distance=OCR_PHASH_MAX_DISTANCE):
+        self.documents = TieredCache("ocr_documents", maxsize=maxsize, ttl=ttl, disk_path=disk_path)
+        self.pages = TieredCache("ocr_pages", maxsize=maxsize, ttl=ttl, disk_path=disk_path)
+        self.near = None
+        if phash_max_distance >= 0:
+            self.near = PerceptualIndex(phash_max_distance, maxsize=maxsize, ttl=ttl, disk_path=disk_path)
+
+    def document_key(self, data):
+        return make_key("document", hashlib.sha256(data).hexdigest(), OCR_LANGUAGES, OCR_CACHE_VERSION)
+
+    def get_document(self, data):
+        """Return cached extracted text for exact uploaded bytes, or None"""
+        return self.documents.get(self.document_key(data))
+
+    def set_document(self, data, text):
+        self.documents.set(self.document_key(data), text)
+
+    def page_keys(self, image_array):
+        """Exact key over the raster bytes, plus the perceptual hash when near matching is on"""
+        image_array = np.ascontiguousarray(image_array)
+        digest = hashlib.sha256(image_array.data).hexdigest()
+        exact = make_key("page", digest, image_array.shape, image_array.dtype, OCR_LANGUAGES, OCR_CACHE_VERSION)
+        phash = None
+        if self.near is not None:
+            try:
+                phash = perceptual_hash(image_array)
+            except Exception as e:
+                print(f"Perceptual hash failed: {e}")
+        return exact, phash
+
+    def get_page(self, keys):
+        exact, phash = keys
+        text = self.pages.get(exact)
+        if text is None and phash is not None:
+            text = self.near.get(phash)
+        return text
+
+    def set_page(self, keys, text):
+        exact, phash = keys
+        self.pages.set(exact, text)
+        if phash is not None:
+            self.near.set(phash, text)
+
+    def stats(self):
+        stats = {
+            "documents": self.documents.stats.as_dict(),
+            "pages": self.pages.stats.as_dict()
+        }
+        if self.near is not None:
+            stats["near_duplicates"] = self.near.stats.as_dict()
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """Return the process-wide OCR cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OCRCache()
+    return _cache
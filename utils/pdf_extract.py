@@ -0,0 +1,137 @@
+import os
+from io import BytesIO
+
+import numpy as np
+import pdfplumber
+try:
+    from pdf2image import convert_from_bytes
+    PDF2IMAGE_AVAILABLE = True
+except ImportError:
+    PDF2IMAGE_AVAILABLE = False
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+RASTER_ZOOM = 2.0  # PyMuPDF zoom, 2x for better quality (~144 dpi)
+RASTER_DPI = 200  # pdf2image resolution
+
+# Per-page routing thresholds, overridable through the environment
+# A page is OCRed when its text layer is nearly empty, or when images cover most
+# of the page and the text layer is too thin to be the real content.
+MIN_TEXT_CHARS = int(os.getenv("PDF_MIN_TEXT_CHARS", 30))
+DENSE_TEXT_CHARS = int(os.getenv("PDF_DENSE_TEXT_CHARS", 200))
+IMAGE_COVERAGE_THRESHOLD = float(os.getenv("PDF_IMAGE_COVERAGE", 0.5))
+
+
+def page_needs_ocr(text, image_coverage):
+    """Decide from text-layer density and image coverage whether a page must be OCRed"""
+    chars = len("".join((text or "").split()))
+    if chars < MIN_TEXT_CHARS:
+        return True
+    return image_coverage >= IMAGE_COVERAGE_THRESHOLD and chars < DENSE_TEXT_CHARS
+
+
+def image_coverage(boxes, page_width, page_height):
+    """Fraction of the page covered by image bounding boxes (x0, y0, x1, y1), capped at 1"""
+    page_area = page_width * page_height
+    if page_area <= 0:
+        return 0.0
+    covered = 0.0
+    for x0, y0, x1, y1 in boxes:
+        width = min(x1, page_width) - max(x0, 0)
+        height = min(y1, page_height) - max(y0, 0)
+        if width > 0 and height > 0:
+            covered += width * height
+    return min(1.0, covered / page_area)
+
+
+def _pixmap_array(page, zoom=RASTER_ZOOM):
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    # Build the array straight from the raw samples: no PPM encode/decode round trip
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+
+
+def _pdf2image_array(pdf_bytes, page_num, dpi=RASTER_DPI):
+    image = convert_from_bytes(pdf_bytes, dpi=dpi, first_page=page_num, last_page=page_num, grayscale=True)[0]
+    return np.asarray(image)
+
+
+def _analyze_pymupdf(pdf_bytes, rasterize=True):
+    pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+    page_texts = []
+    ocr_indices = []
+    for index, page in enumerate(pdf_document):
+        text = page.get_text("text")
+        boxes = [info["bbox"] for info in page.get_image_info()]
+        rect = page.rect
+        if page_needs_ocr(text, image_coverage(boxes, rect.width, rect.height)):
+            page_texts.append(None)
+            ocr_indices.append(index)
+        else:
+            page_texts.append(text.strip())
+
+    def rasters():
+        # Reuse the already-open document: only the OCR pages are rasterized, lazily and
+        # one at a time, so memory is bounded by the pages in flight, not the document
+        try:
+            for index in ocr_indices:
+                yield _pixmap_array(pdf_document[index])
+        finally:
+            pdf_document.close()
+
+    # A generator that never starts never runs its finally, so the document is closed
+    # here whenever no rasters will be drawn from it
+    if not rasterize:
+        pdf_document.close()
+        return page_texts, ocr_indices, None
+    if not ocr_indices:
+        pdf_document.close()
+    return page_texts, ocr_indices, rasters()
+
+
+def _analyze_pdfplumber(pdf_bytes, rasterize=True):
+    page_texts = []
+    ocr_indices = []
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        for index, page in enumerate(pdf.pages):
+            text = page.extract_text() or ""
+            boxes = [(img["x0"], img["top"], img["x1"], img["bottom"]) for img in page.images]
+            if page_needs_ocr(text, image_coverage(boxes, page.width, page.height)):
+                page_texts.append(None)
+                ocr_indices.append(index)
+            else:
+                page_texts.append(text.strip())
+
+    def rasters():
+        for index in ocr_indices:
+            yield _pdf2image_array(pdf_bytes, index + 1)
+
+    # Without pdf2image the OCR pages cannot be rasterized at all
+    return page_texts, ocr_indices, rasters() if rasterize and PDF2IMAGE_AVAILABLE else None
+
+
+def analyze_pdf(pdf_bytes, rasterize=True):
+    """Classify every page in one pass and keep the text layer of text pages
+
+    Returns (page_texts, ocr_indices, rasters): page_texts[i] is the page text,
+    or None when page i needs OCR; rasters lazily yields a grayscale array for
+    each page in ocr_indices, in order, and is None when no rasterizer is installed
+    or rasterize is False.
+    """
+    if PYMUPDF_AVAILABLE:
+        try:
+            return _analyze_pymupdf(pdf_bytes, rasterize)
+        except Exception as e:
+            print(f"PyMuPDF page analysis failed, falling back to pdfplumber: {e}")
+    return _analyze_pdfplumber(pdf_bytes, rasterize)
+
+
+def is_pdf_image_based(pdf_bytes):
+    """Check if PDF is image-based (scanned) on every page"""
+    try:
+        page_texts, _, _ = analyze_pdf(pdf_bytes, rasterize=False)
+        return all(text is None for text in page_texts)
+    except Exception:
+        return True  # Assume image-based if can't read normally
@@ -0,0 +1,139 @@
+import threading
+import unicodedata
+from functools import lru_cache
+
+# Per-font glyph advance widths at size 1, filled lazily. For unshaped fonts
+# ReportLab's TTF stringWidth is a plain sum of per-glyph advances, so summing
+# this table gives the same widths without re-measuring every word.
+_char_widths = {}
+_lock = threading.Lock()
+
+
+def _width_table(font_name):
+    table = _char_widths.get(font_name)
+    if table is None:
+        with _lock:
+            table = _char_widths.setdefault(font_name, {})
+    return table
+
+
+@lru_cache(maxsize=None)
+def _shapable(font_name):
+    from reportlab.pdfbase import pdfmetrics
+    return bool(getattr(pdfmetrics.getFont(font_name), "shapable", False))
+
+
+@lru_cache(maxsize=65536)
+def _shaped_width(text, font_name):
+    """Advance width at size 1 of text after OpenType shaping, as shape() lays it out"""
+    shaped = shape(text, font_name, 1)
+    return sum(glyph.x_advance for glyph in getattr(shaped, "__shapeData__", ())) / 1000
+
+
+def shape(text, font_name, font_size):
+    """text shaped with OpenType features (reordered vowel signs, conjuncts) for drawString
+
+    drawString(shaping=True) only shapes when ReportLab's bidi extension is also
+    installed, so lines are shaped here; unshapable fonts get text back unchanged.
+    Each word is shaped on its own, as ReportLab's bidi path does: HarfBuzz guesses
+    the script from the start of its input, and a line starting with "Form 16"
+    would otherwise shape the Indic words after it as Latin.
+    """
+    if not _shapable(font_name):
+        return text
+    from reportlab.pdfbase.ttfonts import shapeStr
+
+    space = shapeStr(" ", font_name, font_size, force=True)
+    shaped = None
+    for word in text.split(" "):
+        piece = shapeStr(word, font_name, font_size, force=True) if word else ""
+        shaped = piece if shaped is None else shaped + space + piece
+    return shaped
+
+
+def text_width(text, font_name, font_size):
+    """Width of text in points: shaped and memoized per word, or memoized per glyph for unshaped fonts"""
+    if _shapable(font_name):
+        return _shaped_width(text, font_name) * font_size
+
+    from reportlab.pdfbase import pdfmetrics
+
+    table = _width_table(font_name)
+    total = 0.0
+    for char in text:
+        width = table.get(char)
+        if width is None:
+            width = pdfmetrics.stringWidth(char, font_name, 1000) / 1000
+            table[char] = width
+        total += width
+    return total * font_size
+
+
+def _split_word(word, font_name, font_size, max_width):
+    """Break a word wider than a line at character boundaries, keeping combining marks attached"""
+    pieces = []
+    current = ""
+    for char in word:
+        # Shaped widths are not additive per character, so the candidate piece is measured whole.
+        # Never start a piece with a combining mark (matra, virama, nukta)
+        if (current and unicodedata.category(char) not in ("Mn", "Mc")
+                and text_width(current + char, font_name, font_size) > max_width):
+            pieces.append(current)
+            current = ""
+        current += char
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def wrap_paragraph(paragraph, font_name, font_size, max_width):
+    """Greedy line breaking by measured width; returns a list of lines"""
+    space = text_width(" ", font_name, font_size)
+    lines = []
+    current = []
+    current_width = 0.0
+    for word in paragraph.split():
+        width = text_width(word, font_name, font_size)
+        if width > max_width:
+            if current:
+                lines.append(" ".join(current))
+                current, current_width = [], 0.0
+            *full, word = _split_word(word, font_name, font_size, max_width)
+            lines.extend(full)
+            width = text_width(word, font_name, font_size)
+        if current and current_width + space + width > max_width:
+            lines.append(" ".join(current))
+            current, current_width = [], 0.0
+        current_width += width + (space if current else 0.0)
+        current.append(word)
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def wrap_text(text, font_name, font_size, max_width):
+    """Wrap text into lines, one list per paragraph (blank-line or newline separated)"""
+    return [wrap_paragraph(paragraph, font_name, font_size, max_width)
+            for paragraph in text.splitlines() if paragraph.strip()]
+
+
+def draw_text(canvas, text, font_name, font_size, x, y, max_width, line_height,
+              top, bottom, paragraph_spacing=None):
+    """Flow text onto the canvas from (x, y), starting new pages below bottom
+
+    New pages start at top. Returns the y position after the last line.
+    """
+    if paragraph_spacing is None:
+        paragraph_spacing = line_height / 2
+    canvas.setFont(font_name, font_size)
+    for index, lines in enumerate(wrap_text(text, font_name, font_size, max_width)):
+        if index:
+            y -= paragraph_spacing
+        for line in lines:
+            if y < bottom:
+                canvas.showPage()
+                canvas.setFont(font_name, font_size)
+                y = top
+            canvas.drawString(x, y, shape(line, font_name, font_size))
+            y -= line_height
+    return y
@@ -0,0 +1,169 @@
+import os
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Set OCR_PREPROCESS=0 to hand raw images to easyocr as before
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") != "0"
+
+# Stage settings per input type; OCR time scales with pixel count, so the main
+# win is normalizing resolution before detection runs
+PROFILES = {
+    # Phone photos: often 12 MP, rotated through EXIF and slightly skewed
+    "photo": {
+        "exif_transpose": True,
+        "grayscale": True,
+        "target_text_height": 28,  # Median glyph height in pixels after scaling
+        "max_pixels": 4_000_000,
+        "deskew": True,
+        "binarize": False
+    },
+    # PDF page rasters (~144-200 dpi): upright and already at a sensible resolution
+    "raster": {
+        "exif_transpose": False,
+        "grayscale": True,
+        "target_text_height": None,
+        "max_pixels": 6_000_000,
+        "deskew": True,
+        "binarize": False
+    }
+}
+
+MIN_SCALE = 0.25  # Never shrink below a quarter, whatever the estimate says
+MAX_SKEW_DEGREES = 10.0
+ANALYSIS_WIDTH = 1000  # Text height and skew are estimated on a thumbnail this wide
+# Below this share of ink pixels, or this best-to-mean alignment ratio (noise is ~1.1,
+# a single text line ~3), a page has no text lines to align and is left unrotated
+MIN_SKEW_INK = 0.001
+MIN_SKEW_PEAK = 1.5
+
+
+def to_array(image, exif_transpose=False):
+    """Return an RGB or grayscale uint8 array from a PIL image or array"""
+    if isinstance(image, Image.Image):
+        if exif_transpose:
+            image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        return np.asarray(image)
+    image = np.asarray(image)
+    if image.ndim == 3 and image.shape[2] == 4:
+        image = image[..., :3]
+    return image
+
+
+def to_grayscale(image_array):
+    import cv2
+    if image_array.ndim == 2:
+        return image_array
+    return cv2.cvtColor(np.ascontiguousarray(image_array), cv2.COLOR_RGB2GRAY)
+
+
+def _analysis_thumbnail(gray):
+    """Inverted Otsu binarization of a small copy: text becomes white (255)"""
+    import cv2
+    height, width = gray.shape
+    factor = min(1.0, ANALYSIS_WIDTH / width)
+    small = gray if factor == 1.0 else cv2.resize(gray, (int(width * factor), max(1, int(height * factor))),
+                                                  interpolation=cv2.INTER_AREA)
+    _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return binary, factor
+
+
+def estimate_text_height(gray):
+    """Median height in pixels of character-like connected components, or None"""
+    import cv2
+    binary, factor = _analysis_thumbnail(gray)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    height, width = binary.shape
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    keep = (heights >= 3) & (heights < height * 0.2) & (widths < width * 0.5) & (areas >= 6)
+    if keep.sum() < 20:
+        return None
+    return float(np.median(heights[keep])) / factor
+
+
+def resize_for_ocr(gray, target_text_height=None, max_pixels=None):
+    """Downscale so glyphs are about target_text_height pixels tall and the image fits max_pixels"""
+    import cv2
+    height, width = gray.shape
+    scale = 1.0
+    if target_text_height:
+        text_height = estimate_text_height(gray)
+        if text_height:
+            scale = min(scale, target_text_height / text_height)
+    if max_pixels and height * width > max_pixels:
+        scale = min(scale, (max_pixels / (height * width)) ** 0.5)
+    scale = max(scale, MIN_SCALE)
+    if scale >= 0.99:
+        return gray
+    return cv2.resize(gray, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+
+
+def _rotate(image_array, angle):
+    import cv2
+    height, width = image_array.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(image_array, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_REPLICATE)
+
+
+def _line_alignment(binary, angle):
+    # Rows of well-aligned text give a spiky row-sum profile, i.e. a high variance
+    return float(np.var(_rotate(binary, angle).sum(axis=1, dtype=np.float64)))
+
+
+def estimate_skew(gray, max_angle=MAX_SKEW_DEGREES):
+    """Rotation in degrees (for _rotate) that best aligns text lines horizontally"""
+    binary, _ = _analysis_thumbnail(gray)
+    if np.count_nonzero(binary) < binary.size * MIN_SKEW_INK:
+        return 0.0
+    coarse = np.arange(-max_angle, max_angle + 0.01, 1.0)
+    scores = [_line_alignment(binary, a) for a in coarse]
+    if max(scores) < np.mean(scores) * MIN_SKEW_PEAK:
+        return 0.0  # Flat profile: any "best" angle would be noise
+    best = coarse[int(np.argmax(scores))]
+    fine = np.arange(best - 0.8, best + 0.81, 0.2)
+    angle = float(max(fine, key=lambda a: _line_alignment(binary, a)))
+    return min(max_angle, max(-max_angle, angle))
+
+
+def deskew(gray, max_angle=MAX_SKEW_DEGREES):
+    angle = estimate_skew(gray, max_angle)
+    if abs(angle) < 0.3:
+        return gray
+    return _rotate(gray, angle)
+
+
+def binarize(gray):
+    import cv2
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+
+def preprocess_image(image, profile="photo", **overrides):
+    """Run the configured preprocessing stages for an input type and return a uint8 array
+
+    Stage order: EXIF orientation, grayscale, downscale, deskew, binarize.
+    Keyword overrides replace individual profile settings.
+    """
+    settings = dict(PROFILES[profile], **overrides)
+    image_array = to_array(image, settings["exif_transpose"])
+    if not OCR_PREPROCESS:
+        return image_array
+
+    try:
+        if settings["grayscale"] or settings["deskew"] or settings["binarize"]:
+            image_array = to_grayscale(image_array)
+        if image_array.ndim == 2:
+            image_array = resize_for_ocr(image_array, settings["target_text_height"], settings["max_pixels"])
+            if settings["deskew"]:
+                image_array = deskew(image_array)
+            if settings["binarize"]:
+                image_array = binarize(image_array)
+    except Exception as e:
+        # Preprocessing is an optimization; fall back to the unprocessed image
+        print(f"Image preprocessing failed: {e}")
+        return to_array(image, settings["exif_transpose"])
+    return image_array
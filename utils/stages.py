@@ -0,0 +1,57 @@
+import hashlib
+
+import streamlit as st
+
+from utils.cache import make_key
+from utils.metrics import registry
+
+# Streamlit reruns the whole page on every widget change; each pipeline stage
+# (upload -> extract -> explain -> artifacts) keeps its last result here together
+# with the fingerprint of its inputs, so a rerun only recomputes changed stages.
+STATE_KEY = "pipeline_stages"
+
+
+def upload_fingerprint(uploaded_file):
+    """Cheap identity of an uploaded file: Streamlit's file_id when present, else a content hash"""
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id:
+        return make_key("upload", file_id, uploaded_file.name, uploaded_file.size)
+    return make_key("upload", hashlib.sha256(uploaded_file.getvalue()).hexdigest())
+
+
+def fingerprint(*parts):
+    return make_key(*parts)
+
+
+def get_stage(name, key):
+    """Return the memoized result of a stage if its input fingerprint is unchanged, else None"""
+    entry = st.session_state.get(STATE_KEY, {}).get(name)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    return None
+
+
+def set_stage(name, key, result):
+    st.session_state.setdefault(STATE_KEY, {})[name] = (key, result)
+
+
+def clear_stage(name):
+    st.session_state.get(STATE_KEY, {}).pop(name, None)
+
+
+def run_stage(name, key, compute, keep=lambda result: result is not None):
+    """Return the memoized stage result for key, computing and storing it on a miss
+
+    Results rejected by keep are not memoized. By default that is None, so a
+    compute() that signals failure with None is retried on the next rerun.
+    """
+    result = get_stage(name, key)
+    registry.inc("bhashaai_rerun_memo_total", stage=name, result="miss" if result is None else "hit")
+    if result is not None:
+        return result
+    result = compute()
+    if keep(result):
+        set_stage(name, key, result)
+    else:
+        clear_stage(name)
+    return result
@@ -0,0 +1,343 @@
+import base64
+import os
+import random
+import re
+import shutil
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from gtts import gTTS, gTTSError
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import registry, span
+from utils.normalize import SENTENCE_SPLIT_RE
+
+# Google's TTS endpoint takes at most 100 characters per request (gTTS.GOOGLE_TTS_MAX_CHARS)
+TTS_MAX_CHARS = 100
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", 6))
+TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", 2))
+TTS_CONNECT_TIMEOUT = float(os.getenv("TTS_CONNECT_TIMEOUT", 5))
+TTS_READ_TIMEOUT = float(os.getenv("TTS_READ_TIMEOUT", 20))
+
+CLAUSE_SPLIT_RE = re.compile(r"(?<=[,;:،])\s+")
+# Response format of gTTS's batchexecute endpoint, as parsed by gTTS.stream() in the pinned gTTS
+AUDIO_RE = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+class TTSError(Exception):
+    """Raised when a text chunk cannot be synthesized"""
+
+
+class UnsupportedLanguageError(TTSError):
+    """Raised when no available backend can voice a language, e.g. Odia without espeak"""
+
+
+def _split_long(piece, max_chars):
+    """Break a sentence longer than max_chars on clauses, then words, then characters"""
+    parts = []
+    current = ""
+    for word in (w for clause in CLAUSE_SPLIT_RE.split(piece) for w in clause.split()):
+        while len(word) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            parts.append(current)
+            current = ""
+        current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_for_tts(text, max_chars=TTS_MAX_CHARS):
+    """Split text on sentence boundaries into chunks of at most max_chars, packing short sentences"""
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_SPLIT_RE.split(" ".join(text.split())):
+        if not sentence:
+            continue
+        pieces = [sentence] if len(sentence) <= max_chars else _split_long(sentence, max_chars)
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# One keep-alive session and one bounded pool shared by every synthesis in the process
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=TTS_CONCURRENCY))
+_executor = ThreadPoolExecutor(max_workers=TTS_CONCURRENCY, thread_name_prefix="tts")
+
+
+def _decode_audio(response):
+    audio = []
+    for line in response.iter_lines(chunk_size=1024):
+        decoded_line = line.decode("utf-8")
+        if "jQ1olc" in decoded_line:
+            audio_search = AUDIO_RE.search(decoded_line)
+            if not audio_search:
+                raise TTSError("TTS API returned no audio")
+            audio.append(base64.b64decode(audio_search.group(1).encode("ascii")))
+    if not audio:
+        raise TTSError("TTS API returned no audio")
+    return b"".join(audio)
+
+
+def synthesize_chunk(text, lang):
+    """Synthesize one chunk (at most TTS_MAX_CHARS) to MP3 bytes over the shared session"""
+    with span("tts_chunk", backend="gtts", lang=lang, chars=len(text)) as fields:
+        tts = gTTS(text, lang=lang)
+        # gTTS builds the request body; sending it ourselves lets us reuse connections and
+        # retry. _prepare_requests is private, so a gTTS without it takes the public path
+        prepare_requests = getattr(tts, "_prepare_requests", None)
+        if prepare_requests is None:
+            fields["fallback"] = True
+            audio = _write_chunk(tts)
+        else:
+            audio = _send_chunk(prepare_requests())
+        fields["bytes"] = len(audio)
+    registry.inc("bhashaai_tts_chunks_total", backend="gtts")
+    return audio
+
+
+def _write_chunk(tts):
+    """Synthesize through gTTS's public API (its own connection per request, no retries)"""
+    buffer = BytesIO()
+    try:
+        tts.write_to_fp(buffer)
+    except gTTSError as e:
+        raise TTSError(f"TTS request failed: {e}") from e
+    return buffer.getvalue()
+
+
+def _send_chunk(prepared_requests):
+    audio = []
+    for prepared in prepared_requests:
+        attempt = 0
+        while True:
+            try:
+                response = _session.send(prepared, timeout=(TTS_CONNECT_TIMEOUT, TTS_READ_TIMEOUT))
+                response.raise_for_status()
+                audio.append(_decode_audio(response))
+                break
+            except (requests.RequestException, TTSError) as e:
+                if attempt >= TTS_MAX_RETRIES:
+                    raise TTSError(f"TTS request failed: {e}") from e
+                time.sleep(random.uniform(0, 0.5 * (2 ** attempt)))
+                attempt += 1
+    return b"".join(audio)
+
+
+def gtts_stream(text, lang, max_chars=TTS_MAX_CHARS):
+    """Yield MP3 bytes chunk by chunk, in order, while later chunks synthesize concurrently
+
+    MP3 frames are self-contained, so the chunks can be concatenated (or played)
+    as they arrive.
+    """
+    chunks = split_for_tts(text, max_chars)
+    if not chunks:
+        raise TTSError("No text to synthesize")
+    window = []
+    index = 0
+    while index < len(chunks) or window:
+        # Keep at most TTS_CONCURRENCY chunk requests in flight for this text
+        while index < len(chunks) and len(window) < TTS_CONCURRENCY:
+            window.append(_executor.submit(synthesize_chunk, chunks[index], lang))
+            index += 1
+        yield window.pop(0).result()
+
+
+class TTSBackend(ABC):
+    """A speech engine; subclasses set name and mime and implement languages() and synthesize()"""
+
+    name = None
+    mime = "audio/mpeg"
+
+    def available(self):
+        return True
+
+    @abstractmethod
+    def languages(self):
+        """Language codes this engine can voice"""
+
+    def supports(self, lang):
+        return lang in self.languages()
+
+    @abstractmethod
+    def synthesize(self, text, lang):
+        """Return the audio bytes for text; raise TTSError on failure"""
+
+    def stream(self, text, lang):
+        """Yield audio bytes; backends that can play partial output yield several chunks"""
+        yield self.synthesize(text, lang)
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS through gTTS request building; needs network access"""
+
+    name = "gtts"
+
+    def languages(self):
+        from gtts.lang import tts_langs
+        return set(tts_langs())
+
+    def synthesize(self, text, lang):
+        return b"".join(gtts_stream(text, lang))
+
+    def stream(self, text, lang):
+        return gtts_stream(text, lang)
+
+
+class EspeakBackend(TTSBackend):
+    """Local espeak-ng (or espeak) subprocess; fast and offline, WAV output"""
+
+    name = "espeak"
+    mime = "audio/wav"
+    # BhashaAI languages that espeak-ng ships voices for
+    LANGUAGES = {"en", "hi", "mr", "bn", "ta", "te", "ur", "gu", "ml", "kn", "or", "pa"}
+
+    def __init__(self, executable=None):
+        self.executable = executable or os.getenv("ESPEAK_PATH") or shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        return self.executable is not None
+
+    def languages(self):
+        return self.LANGUAGES
+
+    def synthesize(self, text, lang):
+        try:
+            result = subprocess.run(
+                [self.executable, "-v", lang, "--stdin", "--stdout"],
+                input=text.encode("utf-8"), capture_output=True, timeout=TTS_READ_TIMEOUT * 3, check=True
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            raise TTSError(f"espeak failed: {e}") from e
+        if not result.stdout:
+            raise TTSError("espeak produced no audio")
+        registry.inc("bhashaai_tts_chunks_total", backend=self.name)
+        return result.stdout
+
+
+# Engines in default priority order. Override with TTS_BACKENDS="espeak,gtts", or per
+# language with e.g. TTS_BACKENDS_OR="espeak"; air-gapped deployments set TTS_BACKENDS=espeak.
+BACKENDS = {backend.name: backend for backend in (GTTSBackend(), EspeakBackend())}
+TTS_BACKENDS = [name.strip() for name in os.getenv("TTS_BACKENDS", "gtts,espeak").split(",") if name.strip()]
+# A backend slower than this (seconds per 1000 characters, measured) is tried after faster ones
+TTS_LATENCY_BUDGET = float(os.getenv("TTS_LATENCY_BUDGET", 10))
+# After a failure a backend is skipped for this many seconds while others are available
+TTS_FAILURE_COOLDOWN = float(os.getenv("TTS_FAILURE_COOLDOWN", 60))
+LATENCY_SMOOTHING = 0.3
+
+_latency = {}  # (backend, lang) -> smoothed seconds per 1000 characters
+_failed_at = {}  # (backend, lang) -> time of last failure
+_stats_lock = threading.Lock()
+
+
+def _record(backend, lang, seconds=None, chars=0):
+    key = (backend.name, lang)
+    with _stats_lock:
+        if seconds is None:
+            _failed_at[key] = time.monotonic()
+            return
+        _failed_at.pop(key, None)
+        sample = seconds * 1000 / max(chars, 1)
+        previous = _latency.get(key)
+        _latency[key] = sample if previous is None else previous + LATENCY_SMOOTHING * (sample - previous)
+
+
+def backend_order(lang):
+    """Available backends for a language: configured priority, demoted when slow or recently failed"""
+    names = os.getenv(f"TTS_BACKENDS_{lang.upper().replace('-', '_')}")
+    names = [name.strip() for name in names.split(",")] if names else TTS_BACKENDS
+    candidates = [BACKENDS[name] for name in names
+                  if name in BACKENDS and BACKENDS[name].available() and BACKENDS[name].supports(lang)]
+    now = time.monotonic()
+    with _stats_lock:
+        def demotion(item):
+            _, backend = item
+            failed_at = _failed_at.get((backend.name, lang))
+            recently_failed = failed_at is not None and now - failed_at < TTS_FAILURE_COOLDOWN
+            slow = _latency.get((backend.name, lang), 0) > TTS_LATENCY_BUDGET
+            return recently_failed, slow
+        ranked = sorted(enumerate(candidates), key=lambda item: (demotion(item), item[0]))
+    return [backend for _, backend in ranked]
+
+
+def supports(lang):
+    """True when an available backend can voice lang"""
+    return bool(backend_order(lang))
+
+
+def synthesize_with(text, lang):
+    """Synthesize text with the best backend for lang, falling back in order; returns (audio, mime)"""
+    backends = backend_order(lang)
+    if not backends:
+        raise UnsupportedLanguageError(f"No TTS backend supports language '{lang}'")
+    errors = []
+    for backend in backends:
+        started = time.perf_counter()
+        try:
+            with span("tts", backend=backend.name, lang=lang, chars=len(text)) as fields:
+                audio = backend.synthesize(text, lang)
+                fields["bytes"] = len(audio)
+        except Exception as e:
+            # Any failure (requests, gTTS, subprocess) moves on to the next backend
+            _record(backend, lang)
+            errors.append(f"{backend.name}: {e}")
+            print(f"TTS backend {backend.name} failed for {lang}: {e}")
+            continue
+        _record(backend, lang, time.perf_counter() - started, len(text))
+        return audio, backend.mime
+    raise TTSError("; ".join(errors))
+
+
+def synthesize(text, lang):
+    """Synthesize text to a single audio byte string (MP3 or WAV, see audio_mime)"""
+    return synthesize_with(text, lang)[0]
+
+
+def synthesize_stream(text, lang):
+    """Yield audio chunks from the best backend for lang; no fallback once output has started"""
+    backends = backend_order(lang)
+    if not backends:
+        raise UnsupportedLanguageError(f"No TTS backend supports language '{lang}'")
+    backend = backends[0]
+    started = time.perf_counter()
+    try:
+        with span("tts", backend=backend.name, lang=lang, chars=len(text), stream=True, chunks=0) as fields:
+            for chunk in backend.stream(text, lang):
+                fields["chunks"] += 1
+                yield chunk
+    except TTSError:
+        _record(backend, lang)
+        raise
+    except Exception as e:
+        _record(backend, lang)
+        raise TTSError(f"{backend.name}: {e}") from e
+    _record(backend, lang, time.perf_counter() - started, len(text))
+
+
+def audio_mime(data):
+    """MIME type of synthesized audio, sniffed from its header"""
+    return "audio/wav" if data[:4] == b"RIFF" else "audio/mpeg"
+
+
+def tts_stats():
+    with _stats_lock:
+        return {
+            "latency_per_1000_chars": {f"{name}:{lang}": round(value, 3) for (name, lang), value in _latency.items()},
+            "backends": {name: backend.available() for name, backend in BACKENDS.items()}
+        }
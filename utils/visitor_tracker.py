@@ -1,31 +1,114 @@
 import csv
-from datetime import datetime
 import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
 import streamlit as st
 
+# Legacy append-only log; imported once into the counter database, then no longer written
 LOG_FILE = "visitor_log.csv"
+VISITOR_DB = os.getenv("VISITOR_DB", "visitor_counts.sqlite3")
+
+
+class VisitorCounter:
+    """Per-day visit totals in SQLite (WAL), safe across sessions and worker processes"""
+
+    def __init__(self, path=VISITOR_DB, legacy_csv=LOG_FILE):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS daily_visits (date TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY)")
+        self._import_csv(legacy_csv)
+
+    def _connect(self):
+        # One autocommit connection per thread; each statement is its own transaction
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _import_csv(self, legacy_csv):
+        """One-time import of the old visitor_log.csv; concurrent processes import it only once"""
+        if not legacy_csv or not os.path.exists(legacy_csv):
+            return
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM migrations WHERE name = 'visitor_log_csv'").fetchone() is None:
+                totals = Counter()
+                with open(legacy_csv, "r", newline="") as file:
+                    reader = csv.reader(file)
+                    next(reader, None)  # Skip header
+                    for row in reader:
+                        if len(row) >= 2 and row[1].isdigit():
+                            totals[row[0]] += int(row[1])
+                conn.executemany(
+                    "INSERT INTO daily_visits (date, count) VALUES (?, ?) "
+                    "ON CONFLICT(date) DO UPDATE SET count = count + excluded.count",
+                    totals.items()
+                )
+                conn.execute("INSERT INTO migrations (name) VALUES ('visitor_log_csv')")
+            conn.execute("COMMIT")
+        except (OSError, csv.Error, ValueError) as e:
+            # An unreadable legacy log must not break page load; the import is retried next start
+            conn.execute("ROLLBACK")
+            print(f"Skipping import of {legacy_csv}: {e}")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def increment(self, date):
+        self._connect().execute(
+            "INSERT INTO daily_visits (date, count) VALUES (?, 1) "
+            "ON CONFLICT(date) DO UPDATE SET count = count + 1",
+            (date,)
+        )
+
+    def count(self, date):
+        row = self._connect().execute("SELECT count FROM daily_visits WHERE date = ?", (date,)).fetchone()
+        return row[0] if row else 0
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def get_counter():
+    """Return the process-wide visitor counter"""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = VisitorCounter()
+    return _counter
+
 
 def log_visit():
     today = datetime.now().strftime("%Y-%m-%d")
-    
+
     if "visit_logged" not in st.session_state:
         st.session_state.visit_logged = False
 
     if not st.session_state.visit_logged:
-        exists = os.path.exists(LOG_FILE)
-        with open(LOG_FILE, "a", newline="") as file:
-            writer = csv.writer(file)
-            if not exists:
-                writer.writerow(["date", "count"])
-            writer.writerow([today, 1])
+        try:
+            get_counter().increment(today)
+        except sqlite3.Error as e:
+            print(f"Visitor count update failed: {e}")
         st.session_state.visit_logged = True  # Mark visit as logged
 
 def get_today_count():
     today = datetime.now().strftime("%Y-%m-%d")
-    if not os.path.exists(LOG_FILE):
+    try:
+        return get_counter().count(today)
+    except sqlite3.Error as e:
+        print(f"Visitor count read failed: {e}")
         return 0
-    with open(LOG_FILE, "r") as file:
-        reader = csv.reader(file)
-        next(reader, None)  # Skip header
-        count = sum(1 for row in reader if row[0] == today)
-        return count
\ No newline at end of file
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils.fonts import register_devanagari_font
+from utils.ocr import get_ocr_pool, get_shared_reader
+
+# Readiness is also written where Streamlit's static serving (server.enableStaticServing)
+# exposes it, i.e. <app>/app/static/readiness.json, so keep_alive.py can poll it over HTTP
+READINESS_FILE = os.getenv("READINESS_FILE", os.path.join("pages", "static", "readiness.json"))
+# Pool workers start on the first multi-page scan; in process mode each loads its own
+# reader, so warming them at startup multiplies peak memory on small instances
+WARM_OCR_POOL = os.getenv("WARM_OCR_POOL", "").lower() in ("1", "true", "yes")
+
+_state = {
+    "status": "cold",  # cold -> warming -> ready | failed
+    "fonts": False,
+    "ocr_reader": False,
+    "ocr_pool": False,
+    "started_at": None,
+    "ready_at": None,
+    "warmup_seconds": None,
+    "error": None
+}
+_lock = threading.Lock()
+_thread = None
+
+
+def _update(**changes):
+    with _lock:
+        _state.update(changes)
+        snapshot = dict(_state)
+    try:
+        directory = os.path.dirname(READINESS_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{READINESS_FILE}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(snapshot, file)
+        os.replace(tmp_path, READINESS_FILE)
+    except OSError as e:
+        print(f"Could not write readiness file: {e}")
+
+
+def get_readiness():
+    """Return a snapshot of the warm-up state"""
+    with _lock:
+        return dict(_state)
+
+
+def is_ready():
+    return get_readiness()["status"] == "ready"
+
+
+def _warm():
+    started = time.monotonic()
+    try:
+        register_devanagari_font()
+        _update(fonts=True)
+
+        # The shared reader serves single images and serial-mode PDFs
+        get_shared_reader()
+        _update(ocr_reader=True)
+
+        if WARM_OCR_POOL:
+            get_ocr_pool().warm()
+            _update(ocr_pool=True)
+
+        _update(status="ready", ready_at=datetime.now(timezone.utc).isoformat(),
+                warmup_seconds=round(time.monotonic() - started, 2))
+        print(f"BhashaAI warm-up finished in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        _update(status="failed", error=str(e))
+        print(f"BhashaAI warm-up failed: {e}")
+
+
+def start_warmup():
+    """Load OCR models and register fonts in a background thread; safe to call repeatedly"""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return _thread
+        _thread = threading.Thread(target=_warm, name="bhashaai-warmup", daemon=True)
+    _update(status="warming", started_at=datetime.now(timezone.utc).isoformat())
+    _thread.start()
+    return _thread
@@ -3,10 +3,15 @@ Simple wake-up endpoint for keeping the Streamlit app alive
 This can be used by external monitoring services
 """
 
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 import streamlit as st
 from datetime import datetime
 import json
 
+from utils.warmup import get_readiness, start_warmup
+
 def app():
     st.set_page_config(page_title="BhashaAI Wake-Up", layout="wide")
     
@@ -14,9 +19,15 @@ def app():
     
     current_time = datetime.now()
     
+    # Visiting this page also kicks off model warm-up if nothing has yet
+    start_warmup()
+    readiness = get_readiness()
+    
     # Simple health check response
     health_data = {
         "status": "alive",
+        "ready": readiness["status"] == "ready",
+        "readiness": readiness,
         "timestamp": current_time.isoformat(),
         "service": "BhashaAI",
         "message": "App is running and responsive"
@@ -25,6 +36,12 @@ def app():
     st.json(health_data)
     
     st.success(f"✅ App is awake at {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    if readiness["status"] == "ready":
+        st.success("✅ OCR models and fonts are loaded")
+    elif readiness["status"] == "failed":
+        st.error(f"⚠️ Warm-up failed: {readiness['error']}")
+    else:
+        st.info("⏳ OCR models are still loading...")
     
     st.markdown("---")
     st.markdown("[← Back to Main App](../app)")